@@ -0,0 +1,124 @@
+"""
+Ball recall and CPU cost of the ROI/tiled ball pass versus full-frame
+inference at a higher resolution.
+
+    python benchmarks/ball_detection_benchmark.py input_videos/gameplay_10_seconds.mp4 \
+        --model models/best.pt --high-imgsz 1280
+
+Recall and precision are measured against --labels, a track stub whose
+"ball" boxes are ground truth (e.g. the stub train_local_detector.py
+rendered the synthetic clip from). Without labels the high-resolution pass
+alone is the reference: it is independent of the refiner, so the refiner
+cannot score its own detections, but the high-resolution row is then the
+reference itself. A detection matches when its centre is within --match-px
+of the reference centre.
+"""
+import argparse
+import copy
+import os
+import pickle
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from ultralytics import YOLO
+from utils import read_video
+from trackers.ball_refiner import BallRefiner
+
+
+def detect_ball(model, frames, imgsz, conf, ball_class, batch_size=20):
+    ball_tracks = []
+    for i in range(0, len(frames), batch_size):
+        results = model.predict(frames[i:i+batch_size], imgsz=imgsz, conf=conf,
+                                classes=[ball_class], verbose=False)
+        for result in results:
+            if len(result.boxes) == 0:
+                ball_tracks.append({})
+                continue
+            best = int(result.boxes.conf.cpu().numpy().argmax())
+            ball_tracks.append({1: {"bbox": result.boxes.xyxy.cpu().numpy()[best].tolist()}})
+    return ball_tracks
+
+
+def center(ball_frame):
+    x1, y1, x2, y2 = ball_frame[1]['bbox']
+    return (x1 + x2) / 2, (y1 + y2) / 2
+
+
+def matches(ball_frame, reference_frame, match_px):
+    if not ball_frame or not reference_frame:
+        return False
+    (x, y), (rx, ry) = center(ball_frame), center(reference_frame)
+    return ((x - rx) ** 2 + (y - ry) ** 2) ** 0.5 <= match_px
+
+
+def recall(ball_tracks, reference, match_px):
+    total = sum(1 for reference_frame in reference if reference_frame)
+    hits = sum(1 for ball_frame, reference_frame in zip(ball_tracks, reference)
+               if matches(ball_frame, reference_frame, match_px))
+    return hits / total if total else 0.0
+
+
+def precision(ball_tracks, reference, match_px):
+    total = sum(1 for ball_frame in ball_tracks if ball_frame)
+    hits = sum(1 for ball_frame, reference_frame in zip(ball_tracks, reference)
+               if matches(ball_frame, reference_frame, match_px))
+    return hits / total if total else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('video')
+    parser.add_argument('--model', default='models/best.pt')
+    parser.add_argument('--ball-class', default='ball')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--high-imgsz', type=int, default=1280)
+    parser.add_argument('--conf', type=float, default=0.1)
+    parser.add_argument('--max-frames', type=int, default=250)
+    parser.add_argument('--match-px', type=float, default=15.0)
+    parser.add_argument('--labels', help='track stub whose ball boxes are the ground truth')
+    args = parser.parse_args()
+
+    frames = read_video(args.video)[:args.max_frames]
+    model = YOLO(args.model)
+    ball_class = [k for k, v in model.names.items() if v == args.ball_class][0]
+
+    # Warm up so the first timed run does not pay for model setup
+    model.predict(frames[:1], imgsz=args.imgsz, verbose=False)
+
+    results = {}
+
+    start = time.perf_counter()
+    base = detect_ball(model, frames, args.imgsz, args.conf, ball_class)
+    base_seconds = time.perf_counter() - start
+    results[f'full frame @{args.imgsz}'] = (base, base_seconds)
+
+    refiner = BallRefiner(model, conf=args.conf, ball_class_name=args.ball_class)
+    refined = refiner.refine(frames, copy.deepcopy(base))
+    results[f'full frame @{args.imgsz} + ROI/tiles'] = (refined, base_seconds + refiner.stats["seconds"])
+
+    start = time.perf_counter()
+    high = detect_ball(model, frames, args.high_imgsz, args.conf, ball_class)
+    results[f'full frame @{args.high_imgsz}'] = (high, time.perf_counter() - start)
+
+    if args.labels:
+        with open(args.labels, 'rb') as f:
+            reference = pickle.load(f)["ball"][:len(frames)]
+        reference_name = f"labels in {args.labels}"
+    else:
+        # Pseudo ground truth from a pass the refiner takes no part in
+        reference = high
+        reference_name = f"full frame @{args.high_imgsz} (pseudo ground truth)"
+
+    print(f"{len(frames)} frames, ball present in {sum(1 for r in reference if r)} by {reference_name}")
+    print(f"{'configuration':<36}{'recall':>8}{'precision':>11}{'seconds':>10}{'ms/frame':>10}")
+    for name, (ball_tracks, seconds) in results.items():
+        print(f"{name:<36}{recall(ball_tracks, reference, args.match_px):>8.3f}"
+              f"{precision(ball_tracks, reference, args.match_px):>11.3f}"
+              f"{seconds:>10.2f}{seconds / len(frames) * 1000:>10.1f}"
+              f"{'  (reference)' if ball_tracks is reference else ''}")
+    print(f"refiner: {refiner.stats}")
+
+
+if __name__ == '__main__':
+    main()
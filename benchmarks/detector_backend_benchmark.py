@@ -0,0 +1,165 @@
+"""
+Speed and accuracy of the CPU detector backends against the PyTorch path.
+
+    python benchmarks/detector_backend_benchmark.py input_videos/gameplay_10_seconds.mp4 \
+        --model models/best.pt --imgsz 640 --threads 4 --int8
+
+To run offline, point --model and the video at paths that do not exist
+yet: train_local_detector.py renders a synthetic clip from the committed
+track stub to the video path and trains a YOLOv8n on it to --model
+(about 15 minutes on one CPU core), which is then benchmarked on that clip.
+
+    python benchmarks/detector_backend_benchmark.py benchmarks/data/synthetic_clip.mp4 \
+        --model benchmarks/data/local_detector.pt --int8
+
+Accuracy is measured against PyTorch at the same input size: detections
+are matched one-to-one by class and IoU >= --match-iou, and the raw head
+outputs for identical input tensors are compared.
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import torch
+from utils import read_video
+from trackers.detector_backend import TorchDetector, OnnxDetector, letterbox, to_blob, CALIBRATION_FRAMES
+from train_local_detector import train_local_model
+
+
+def run_detector(detector, frames, conf, batch_size=20):
+    # Same batching as Tracker.iter_detections
+    results = []
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        results += detector.predict(frames[i:i+batch_size], conf=conf, verbose=False)
+    return results, time.perf_counter() - start
+
+
+def boxes_of(result):
+    boxes = result.boxes
+    return boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(), boxes.cls.cpu().numpy().astype(int)
+
+
+def iou_matrix(a, b):
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return intersection / (area_a[:, None] + area_b[None, :] - intersection + 1e-9)
+
+
+def compare_detections(results, reference, match_iou):
+    """
+    Greedy one-to-one matching per frame by class and IoU.
+
+    Returns:
+        Dict with precision and recall against the reference, mean IoU and
+        mean absolute confidence difference of the matched boxes
+    """
+    matched, total, reference_total = 0, 0, 0
+    ious, conf_diffs = [], []
+    for result, reference_result in zip(results, reference):
+        boxes, confs, classes = boxes_of(result)
+        ref_boxes, ref_confs, ref_classes = boxes_of(reference_result)
+        total += len(boxes)
+        reference_total += len(ref_boxes)
+        if len(boxes) == 0 or len(ref_boxes) == 0:
+            continue
+
+        overlap = iou_matrix(ref_boxes, boxes)
+        overlap[ref_classes[:, None] != classes[None, :]] = 0
+        for ref_index in np.argsort(-ref_confs):
+            best = int(overlap[ref_index].argmax())
+            if overlap[ref_index, best] < match_iou:
+                continue
+            matched += 1
+            ious.append(overlap[ref_index, best])
+            conf_diffs.append(abs(confs[best] - ref_confs[ref_index]))
+            overlap[:, best] = 0
+
+    return {
+        "boxes": total,
+        "precision": matched / total if total else 1.0,
+        "recall": matched / reference_total if reference_total else 1.0,
+        "mean_iou": float(np.mean(ious)) if ious else float('nan'),
+        "conf_diff": float(np.mean(conf_diffs)) if conf_diffs else float('nan')
+    }
+
+
+def raw_output_difference(torch_detector, onnx_detector, frames, imgsz):
+    # Identical letterboxed tensors into both networks
+    blob = np.stack([to_blob(letterbox(frame, imgsz)[0]) for frame in frames])
+    network = torch_detector.model.model.float().eval()
+    with torch.no_grad():
+        torch_output = network(torch.from_numpy(blob))
+    torch_output = (torch_output[0] if isinstance(torch_output, (list, tuple)) else torch_output).numpy()
+    onnx_output = onnx_detector.session.run(None, {onnx_detector.input_name: blob})[0]
+    return {
+        "box_max_abs": float(np.abs(onnx_output[:, :4] - torch_output[:, :4]).max()),
+        "score_max_abs": float(np.abs(onnx_output[:, 4:] - torch_output[:, 4:]).max())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('video')
+    parser.add_argument('--model', default='models/best.pt')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--threads', type=int, default=0, help='intra-op threads (0: runtime default)')
+    parser.add_argument('--inter-threads', type=int, default=0)
+    parser.add_argument('--int8', action='store_true',
+                        help='also benchmark the INT8 ONNX model (calibrated on this clip if not yet calibrated)')
+    parser.add_argument('--conf', type=float, default=0.1)
+    parser.add_argument('--match-iou', type=float, default=0.5)
+    parser.add_argument('--max-frames', type=int, default=100)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        if os.path.exists(args.video):
+            parser.error(f"{args.model} does not exist; to train a local model, pass a video path that does not "
+                         f"exist yet (the synthetic clip is rendered there) or run train_local_detector.py")
+        train_local_model(args.model, args.video)
+
+    frames = read_video(args.video)[:args.max_frames]
+    options = dict(imgsz=args.imgsz, intra_op_threads=args.threads, inter_op_threads=args.inter_threads)
+
+    detectors = {'torch': TorchDetector(args.model, **options),
+                 'onnx fp32': OnnxDetector(args.model, int8=False, **options)}
+    if args.int8:
+        detectors['onnx int8'] = OnnxDetector(args.model, int8=True, **options)
+        if not detectors['onnx int8'].calibrated:
+            # Calibrate on frames spread over the benchmarked clip
+            indices = np.linspace(0, len(frames) - 1, CALIBRATION_FRAMES).round().astype(int)
+            detectors['onnx int8'].quantize([frames[i] for i in indices], source=args.video)
+
+    results = {}
+    for name, detector in detectors.items():
+        # Warm up outside the timed run
+        detector.predict(frames[:20], conf=args.conf, verbose=False)
+        results[name] = run_detector(detector, frames, args.conf)
+
+    reference, reference_seconds = results['torch']
+    print(f"{len(frames)} frames at imgsz {args.imgsz}, intra-op threads {args.threads or 'default'}, "
+          f"inter-op threads {args.inter_threads or 'default'}")
+    print(f"{'backend':<12}{'ms/frame':>10}{'speedup':>9}{'boxes':>7}{'precision':>11}{'recall':>8}"
+          f"{'mean IoU':>10}{'conf diff':>11}")
+    for name, (detections, seconds) in results.items():
+        accuracy = compare_detections(detections, reference, args.match_iou)
+        print(f"{name:<12}{seconds / len(frames) * 1000:>10.1f}{reference_seconds / seconds:>8.2f}x"
+              f"{accuracy['boxes']:>7}{accuracy['precision']:>11.3f}{accuracy['recall']:>8.3f}"
+              f"{accuracy['mean_iou']:>10.3f}{accuracy['conf_diff']:>11.4f}")
+
+    for name, detector in detectors.items():
+        if name == 'torch':
+            continue
+        difference = raw_output_difference(detectors['torch'], detector, frames[:4], args.imgsz)
+        print(f"{name} raw head vs torch: box max |diff| {difference['box_max_abs']:.4f} px, "
+              f"score max |diff| {difference['score_max_abs']:.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Inference time saved by skipping non-live shots (close-ups, replays,
+transitions) found by SceneDetector, versus tracking every frame.
+
+    python benchmarks/scene_detection_benchmark.py input_videos/broadcast.mp4 \
+        --model models/best.pt
+
+Scene detection time is charged to the skipping run. The number of
+distinct track ids is printed for both runs: without resets ByteTrack
+carries ids across cuts, with them every shot starts fresh.
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils import read_video, get_video_info
+from trackers import Tracker
+from scene_detector import SceneDetector
+
+
+def count_track_ids(tracks):
+    return len({track_id for frame in tracks["players"] for track_id in frame})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('video')
+    parser.add_argument('--model', default='models/best.pt')
+    parser.add_argument('--max-frames', type=int, default=None)
+    args = parser.parse_args()
+
+    frames = read_video(args.video)[:args.max_frames]
+    fps = get_video_info(args.video)["fps"]
+
+    # Warm up so the first timed run does not pay for model setup
+    Tracker(args.model).model.predict(frames[:1], verbose=False)
+
+    start = time.perf_counter()
+    tracks = Tracker(args.model).get_object_tracks(frames, refine_ball=False)
+    all_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scenes = SceneDetector(fps).detect_scenes(frames)
+    scene_seconds = time.perf_counter() - start
+    tracker = Tracker(args.model)
+    live_tracks = tracker.get_object_tracks(frames, refine_ball=False, scenes=scenes)
+    live_seconds = time.perf_counter() - start
+
+    labels = {}
+    for shot in scenes["shots"]:
+        labels[shot["label"]] = labels.get(shot["label"], 0) + shot["end"] - shot["start"]
+
+    print(f"{len(frames)} frames, {len(scenes['shots'])} shots, {len(scenes['cuts'])} cuts")
+    print("frames per label: " + ", ".join(f"{label} {count}" for label, count in sorted(labels.items())))
+    print(f"scene detection: {scene_seconds:.2f}s ({scene_seconds / len(frames) * 1000:.1f} ms/frame)")
+    print(f"{'configuration':<24}{'frames':>8}{'seconds':>10}{'track ids':>11}")
+    print(f"{'every frame':<24}{len(frames):>8}{all_seconds:>10.2f}{count_track_ids(tracks):>11}")
+    print(f"{'live frames only':<24}{len(frames) - tracker.skipped_frames:>8}{live_seconds:>10.2f}"
+          f"{count_track_ids(live_tracks):>11}")
+    print(f"saved: {all_seconds - live_seconds:.2f}s ({(1 - live_seconds / all_seconds) * 100:.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Train a small local detector so the benchmarks can run offline with real weights.
+
+    python benchmarks/train_local_detector.py --model benchmarks/data/local_detector.pt \
+        --video benchmarks/data/synthetic_clip.mp4 --epochs 30
+
+A synthetic broadcast clip is rendered from a committed track stub: every
+player, referee and ball box of the stub is drawn on a pitch, so the stub
+is also the exact label set. A YOLOv8n is trained from scratch (fixed seed,
+deterministic) on every --label-every'th frame and the weights are written
+to --model. Benchmark the clip itself: the model has never seen anything
+else.
+
+30 epochs take about 15 minutes on one CPU core. That is enough for
+confident player and referee boxes and real activation ranges for INT8
+calibration. The ball, a few pixels wide, is not detected at conf 0.1
+after 30 epochs; raise --epochs before using the model for the ball
+benchmark.
+"""
+import argparse
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+CLASS_NAMES = {0: 'player', 1: 'referee', 2: 'ball'}
+OBJECT_CLASSES = {'players': 0, 'referees': 1, 'ball': 2}
+
+PITCH_COLOR = (40, 140, 40)
+KIT_COLORS = [((30, 30, 220), (240, 240, 240)), ((220, 60, 30), (20, 20, 20))]
+REFEREE_COLORS = ((0, 220, 240), (20, 20, 20))
+BALL_COLOR = (245, 245, 245)
+
+
+def render_frame(frame_tracks, width, height, frame_num):
+    """
+    Draw one frame of the synthetic clip.
+
+    Args:
+        frame_tracks: {object type: {track_id: {"bbox": ...}}} for this frame
+        width, height: Frame size
+        frame_num: Frame index, used to pan the pitch stripes
+
+    Returns:
+        BGR frame
+    """
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = PITCH_COLOR
+    # Mown stripes that pan with the camera
+    stripes = ((np.arange(width) + 2 * frame_num) // 120) % 2 == 0
+    frame[:, stripes] = (50, 160, 50)
+
+    for object, tracks in frame_tracks.items():
+        for track_id, track_info in tracks.items():
+            x1, y1, x2, y2 = (int(round(v)) for v in track_info['bbox'])
+            if object == 'ball':
+                center = ((x1 + x2) // 2, (y1 + y2) // 2)
+                cv2.circle(frame, center, max(2, (x2 - x1) // 2), BALL_COLOR, -1)
+                continue
+            shirt, shorts = REFEREE_COLORS if object == 'referees' else KIT_COLORS[int(track_id) % 2]
+            waist = y1 + (y2 - y1) // 2
+            knee = y1 + 3 * (y2 - y1) // 4
+            cv2.circle(frame, ((x1 + x2) // 2, y1 + (y2 - y1) // 10), max(2, (x2 - x1) // 5), (80, 110, 160), -1)
+            cv2.rectangle(frame, (x1 + (x2 - x1) // 5, y1 + (y2 - y1) // 5), (x2 - (x2 - x1) // 5, waist), shirt, -1)
+            cv2.rectangle(frame, (x1 + (x2 - x1) // 4, waist), (x2 - (x2 - x1) // 4, knee), shorts, -1)
+            cv2.rectangle(frame, (x1 + (x2 - x1) // 3, knee), (x2 - (x2 - x1) // 3, y2), (20, 20, 20), -1)
+    return frame
+
+
+def render_clip(tracks, video_path, width=1920, height=1080, fps=25):
+    """
+    Render the synthetic clip for a track stub and write it to video_path.
+
+    Returns:
+        List of BGR frames
+    """
+    frames = []
+    os.makedirs(os.path.dirname(video_path) or '.', exist_ok=True)
+    out = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    for frame_num in range(len(tracks['players'])):
+        frame_tracks = {object: tracks[object][frame_num] for object in OBJECT_CLASSES}
+        frame = render_frame(frame_tracks, width, height, frame_num)
+        out.write(frame)
+        frames.append(frame)
+    out.release()
+    return frames
+
+
+def write_dataset(frames, tracks, dataset_dir, label_every=5):
+    """
+    Write frames and their stub boxes as a YOLO dataset.
+
+    Returns:
+        Path of the dataset yaml
+    """
+    images_dir = os.path.join(dataset_dir, 'images', 'train')
+    labels_dir = os.path.join(dataset_dir, 'labels', 'train')
+    os.makedirs(images_dir, exist_ok=True)
+    os.makedirs(labels_dir, exist_ok=True)
+
+    for frame_num in range(0, len(frames), label_every):
+        height, width = frames[frame_num].shape[:2]
+        cv2.imwrite(os.path.join(images_dir, f'{frame_num:05d}.jpg'), frames[frame_num])
+        with open(os.path.join(labels_dir, f'{frame_num:05d}.txt'), 'w') as f:
+            for object, class_id in OBJECT_CLASSES.items():
+                for track_info in tracks[object][frame_num].values():
+                    x1, y1, x2, y2 = track_info['bbox']
+                    f.write(f"{class_id} {(x1 + x2) / 2 / width:.6f} {(y1 + y2) / 2 / height:.6f} "
+                            f"{(x2 - x1) / width:.6f} {(y2 - y1) / height:.6f}\n")
+
+    data_path = os.path.join(dataset_dir, 'data.yaml')
+    with open(data_path, 'w') as f:
+        f.write(f"path: {os.path.abspath(dataset_dir)}\ntrain: images/train\nval: images/train\nnames:\n")
+        for class_id, name in CLASS_NAMES.items():
+            f.write(f"  {class_id}: {name}\n")
+    return data_path
+
+
+def train_local_model(model_path, video_path, stub_path='stubs/track_stubs_gameplay10.pkl',
+                      epochs=30, imgsz=640, label_every=5):
+    """
+    Render the synthetic clip, train a YOLOv8n on it and save the weights.
+
+    Args:
+        model_path: Output .pt path
+        video_path: Output path of the rendered clip to benchmark on
+        stub_path: Track stub the clip and labels are drawn from
+        epochs: Training epochs
+        imgsz: Training input size
+        label_every: Frame step of the training images
+
+    Returns:
+        model_path
+    """
+    with open(stub_path, 'rb') as f:
+        tracks = pickle.load(f)
+    frames = render_clip(tracks, video_path)
+    print(f"Rendered {len(frames)} frames from {stub_path} to {video_path}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_path = write_dataset(frames, tracks, os.path.join(work_dir, 'dataset'), label_every)
+        model = YOLO('yolov8n.yaml')
+        model.train(data=data_path, epochs=epochs, imgsz=imgsz, batch=8, workers=0, device='cpu',
+                    pretrained=False, amp=False, plots=False, val=False, seed=0, deterministic=True,
+                    project=os.path.join(work_dir, 'runs'), name='local', exist_ok=True)
+        os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+        shutil.copy(os.path.join(work_dir, 'runs', 'local', 'weights', 'last.pt'), model_path)
+    print(f"Trained {model_path} for {epochs} epochs on every {label_every}th frame")
+    return model_path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', default='benchmarks/data/local_detector.pt')
+    parser.add_argument('--video', default='benchmarks/data/synthetic_clip.mp4')
+    parser.add_argument('--stub', default='stubs/track_stubs_gameplay10.pkl')
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--label-every', type=int, default=5)
+    args = parser.parse_args()
+
+    train_local_model(args.model, args.video, args.stub, args.epochs, args.imgsz, args.label_every)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+Calibrate and write the INT8 ONNX detector used with DETECTOR_BACKEND=onnx DETECTOR_INT8=1.
+
+    python calibrate_detector.py input_videos/gameplay_10_seconds.mp4 --model models/best.pt --frames 32
+
+Calibration frames are spread evenly over the video, so every kind of
+shot in it contributes to the activation ranges.
+"""
+import argparse
+import numpy as np
+from utils import read_video
+from trackers.detector_backend import OnnxDetector, CALIBRATION_FRAMES, DETECTOR_IMGSZ
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('video')
+    parser.add_argument('--model', default='models/best.pt')
+    parser.add_argument('--imgsz', type=int, default=DETECTOR_IMGSZ)
+    parser.add_argument('--frames', type=int, default=CALIBRATION_FRAMES)
+    args = parser.parse_args()
+
+    frames = read_video(args.video)
+    indices = np.linspace(0, len(frames) - 1, min(args.frames, len(frames))).round().astype(int)
+
+    detector = OnnxDetector(args.model, imgsz=args.imgsz, int8=True)
+    int8_path = detector.quantize([frames[i] for i in indices], source=args.video)
+    print(f"Wrote {int8_path}, calibrated on {len(indices)} frames of {args.video}")
+
+
+if __name__ == '__main__':
+    main()
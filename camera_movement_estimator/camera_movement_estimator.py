@@ -6,6 +6,12 @@ import sys
 sys.path.append('../')
 from utils import measure_distance,measure_xy_distance
 
+def to_grayscale(frame):
+    # Frames from decode_video(outputs=("gray",)) are already single channel
+    if frame.ndim == 2:
+        return frame
+    return cv2.cvtColor(frame,cv2.COLOR_BGR2GRAY)
+
 class CameraMovementEstimator():
     def __init__(self,frame):
         self.minimum_distance = 5
@@ -16,7 +22,7 @@ class CameraMovementEstimator():
             criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT,10,0.03)
         )
 
-        first_frame_grayscale = cv2.cvtColor(frame,cv2.COLOR_BGR2GRAY)
+        first_frame_grayscale = to_grayscale(frame)
         mask_features = np.zeros_like(first_frame_grayscale)
         mask_features[:,0:20] = 1
         mask_features[:,900:1050] = 1
@@ -40,7 +46,7 @@ class CameraMovementEstimator():
                     
 
 
-    def get_camera_movement(self,frames,read_from_stub=False, stub_path=None):
+    def get_camera_movement(self,frames,read_from_stub=False, stub_path=None, cuts=None):
         # Read the stub 
         if read_from_stub and stub_path is not None and os.path.exists(stub_path):
             with open(stub_path,'rb') as f:
@@ -48,11 +54,20 @@ class CameraMovementEstimator():
 
         camera_movement = [[0,0]]*len(frames)
 
-        old_gray = cv2.cvtColor(frames[0],cv2.COLOR_BGR2GRAY)
+        old_gray = to_grayscale(frames[0])
         old_features = cv2.goodFeaturesToTrack(old_gray,**self.features)
 
+        cuts = set(cuts) if cuts is not None else set()
+
         for frame_num in range(1,len(frames)):
-            frame_gray = cv2.cvtColor(frames[frame_num],cv2.COLOR_BGR2GRAY)
+            frame_gray = to_grayscale(frames[frame_num])
+
+            # No flow across a shot change (or without features); start again from this frame
+            if frame_num in cuts or old_features is None:
+                old_features = cv2.goodFeaturesToTrack(frame_gray,**self.features)
+                old_gray = frame_gray.copy()
+                continue
+
             new_features, _,_ = cv2.calcOpticalFlowPyrLK(old_gray,frame_gray,old_features,None,**self.lk_params)
 
             max_distance = 0
@@ -0,0 +1,163 @@
+import os
+import numpy as np
+from events.pass_detector import MIN_PASS_DISTANCE
+from events.possession import POSSESSION_DISTANCE
+
+# Ball speed (pixels/second) above which the ball is considered in free flight
+FLIGHT_MIN_SPEED = float(os.getenv('FLIGHT_MIN_SPEED', '250'))
+# Direction change (degrees) between frames that marks a touch/deflection
+FLIGHT_MAX_TURN = float(os.getenv('FLIGHT_MAX_TURN', '35'))
+FLIGHT_MIN_FRAMES = int(os.getenv('FLIGHT_MIN_FRAMES', '3'))
+MAX_FLIGHT_TIME = float(os.getenv('MAX_FLIGHT_TIME', '3.0'))
+# Frames around each end of a flight searched for the touching player
+CONTACT_WINDOW = int(os.getenv('CONTACT_WINDOW', '3'))
+CONTACT_DISTANCE = float(os.getenv('CONTACT_DISTANCE', str(POSSESSION_DISTANCE * 1.5)))
+SMOOTHING_FRAMES = int(os.getenv('SMOOTHING_FRAMES', '3'))
+TURN_BASELINE = int(os.getenv('TURN_BASELINE', '2'))
+
+
+def get_ball_centers(ball_track):
+    """
+    Ball centre per frame as an (n, 2) float array, NaN where there is no ball.
+    """
+    centers = np.full((len(ball_track), 2), np.nan)
+    for frame_num, ball_frame in enumerate(ball_track):
+        if ball_frame and 1 in ball_frame:
+            x1, y1, x2, y2 = ball_frame[1]['bbox']
+            centers[frame_num] = ((x1 + x2) / 2, (y1 + y2) / 2)
+    return centers
+
+
+def segment_ball_flight(centers, fps):
+    """
+    Split a ball trajectory into contact points and free-flight segments.
+
+    A frame is in flight when the ball moves faster than FLIGHT_MIN_SPEED
+    without turning by more than FLIGHT_MAX_TURN; every other frame is a
+    contact (held, touched, deflected or missing).
+
+    Args:
+        centers: (n, 2) ball centres, NaN where missing
+        fps: Frames per second
+
+    Returns:
+        Dict: {"flights": (m, 2) int array of [start_contact, end_contact]
+               frames, "speed": (n,) pixels/second, "contact": (n,) bool}
+    """
+    num_frames = len(centers)
+    if num_frames < 3:
+        return {"flights": np.zeros((0, 2), dtype=int), "speed": np.zeros(num_frames), "contact": np.ones(num_frames, dtype=bool)}
+
+    if SMOOTHING_FRAMES > 1:
+        kernel = np.ones(SMOOTHING_FRAMES) / SMOOTHING_FRAMES
+        padded = np.pad(centers, ((SMOOTHING_FRAMES // 2, SMOOTHING_FRAMES - 1 - SMOOTHING_FRAMES // 2), (0, 0)), mode='edge')
+        centers = np.column_stack([np.convolve(padded[:, i], kernel, mode='valid') for i in range(2)])
+
+    velocity = np.gradient(centers, axis=0) * fps
+    speed = np.linalg.norm(velocity, axis=1)
+
+    # Angle between the incoming and outgoing headings a few frames either
+    # side, so a turn spread over the smoothing window is still caught
+    heading = np.arctan2(velocity[:, 1], velocity[:, 0])
+    padded_heading = np.pad(heading, TURN_BASELINE, mode='edge')
+    turn = np.degrees(np.abs(np.angle(np.exp(1j * (padded_heading[2 * TURN_BASELINE:] - padded_heading[:-2 * TURN_BASELINE])))))
+
+    in_flight = (speed >= FLIGHT_MIN_SPEED) & (turn <= FLIGHT_MAX_TURN)
+    in_flight &= ~np.isnan(speed)
+    contact = ~in_flight
+
+    # Run boundaries of the in-flight mask
+    edges = np.diff(np.concatenate([[0], in_flight.astype(np.int8), [0]]))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    long_enough = (run_ends - run_starts) >= FLIGHT_MIN_FRAMES
+
+    # Flights run from the last contact before to the first contact after
+    flights = np.column_stack([np.maximum(run_starts[long_enough] - 1, 0),
+                               np.minimum(run_ends[long_enough], num_frames - 1)])
+    return {"flights": flights.astype(int), "speed": speed, "contact": contact}
+
+
+def _flatten_players(players_track, team_assignments):
+    frames, ids, positions = [], [], []
+    for frame_num, player_frame in enumerate(players_track):
+        for player_id, player_data in player_frame.items():
+            if player_id not in team_assignments:
+                continue
+            bbox = player_data['bbox']
+            frames.append(frame_num)
+            ids.append(player_id)
+            positions.append(((bbox[0] + bbox[2]) / 2, bbox[3]))
+    return np.array(frames, dtype=int), np.array(ids), np.array(positions, dtype=float).reshape(-1, 2)
+
+
+def _nearest_player(player_frames, player_ids, player_positions, centers, first, last):
+    # Closest (player, distance) to the ball over frames [first, last]
+    lo = np.searchsorted(player_frames, first, side='left')
+    hi = np.searchsorted(player_frames, last, side='right')
+    if lo == hi:
+        return None, np.inf
+    distances = np.linalg.norm(player_positions[lo:hi] - centers[player_frames[lo:hi]], axis=1)
+    distances = np.where(np.isnan(distances), np.inf, distances)
+    best = int(np.argmin(distances))
+    return player_ids[lo + best], distances[best]
+
+
+def detect_flight_passes(tracks, team_assignments, fps):
+    """
+    Detect passes from ball flight segments linked to the players at each end.
+
+    Args:
+        tracks: Dictionary with 'players' and (interpolated) 'ball' tracks
+        team_assignments: Dict mapping player_id to team number
+        fps: Frames per second
+
+    Returns:
+        List of pass events in the detect_pass_events format, plus
+        "start_frame" (the kick) and "distance" (ball travel in pixels)
+    """
+    pass_events = []
+    if not tracks.get('players') or not tracks.get('ball') or not team_assignments:
+        return pass_events
+
+    centers = get_ball_centers(tracks['ball'])
+    flights = segment_ball_flight(centers, fps)["flights"]
+    if len(flights) == 0:
+        return pass_events
+
+    player_frames, player_ids, player_positions = _flatten_players(tracks['players'], team_assignments)
+    max_flight_frames = int(MAX_FLIGHT_TIME * fps)
+    last_frame = len(centers) - 1
+
+    for start, end in flights:
+        if end - start > max_flight_frames:
+            continue
+        distance = float(np.linalg.norm(centers[end] - centers[start]))
+        if not distance >= MIN_PASS_DISTANCE:
+            continue
+
+        passer, passer_distance = _nearest_player(player_frames, player_ids, player_positions, centers,
+                                                  max(start - CONTACT_WINDOW, 0), start)
+        receiver, receiver_distance = _nearest_player(player_frames, player_ids, player_positions, centers,
+                                                      end, min(end + CONTACT_WINDOW, last_frame))
+        if passer_distance > CONTACT_DISTANCE or receiver_distance > CONTACT_DISTANCE:
+            continue
+        if passer == receiver:
+            continue
+
+        team = team_assignments.get(passer)
+        if not team or team != team_assignments.get(receiver):
+            continue
+
+        pass_events.append({
+            "type": "pass",
+            "frame": int(end),
+            "timestamp": round(int(end) / fps, 1),
+            "team": int(team),
+            "passer": int(passer),
+            "receiver": int(receiver),
+            "start_frame": int(start),
+            "distance": round(distance, 1)
+        })
+
+    return pass_events
@@ -20,7 +20,7 @@ def detect_goals(ball_track, team_possession_history, frame_size, fps):
         fps: Frames per second
         
     Returns:
-        List of goal events: [{"frame": int, "timestamp": float, "team": int}, ...]
+        List of goal events: [{"type": "goal", "frame": int, "timestamp": float, "team": int}, ...]
     """
     goals = []
     
@@ -108,6 +108,7 @@ def detect_goals(ball_track, team_possession_history, frame_size, fps):
                         # But we use possession history as the source of truth
                         
                         goals.append({
+                            "type": "goal",
                             "frame": frame_num,
                             "timestamp": round(frame_num / fps, 1),
                             "team": scoring_team
@@ -18,13 +18,49 @@ def detect_passes(tracks, team_assignments, fps):
         team_assignments: Dict mapping player_id to team number
         fps: Frames per second
         
+    Returns:
+        Dict: {"team1": count, "team2": count}
+    """
+    return count_passes(detect_pass_events(tracks, team_assignments, fps))
+
+def count_passes(pass_events):
+    """
+    Count pass events per team.
+    
+    Args:
+        pass_events: Pass event dicts with a "team" key (detect_pass_events,
+                     detect_flight_passes)
+        
     Returns:
         Dict: {"team1": count, "team2": count}
     """
     pass_counts = {"team1": 0, "team2": 0}
     
+    for pass_event in pass_events:
+        if pass_event["team"] == 1:
+            pass_counts["team1"] += 1
+        elif pass_event["team"] == 2:
+            pass_counts["team2"] += 1
+    
+    return pass_counts
+
+def detect_pass_events(tracks, team_assignments, fps):
+    """
+    Detect completed passes between players of the same team.
+    
+    Args:
+        tracks: Dictionary with 'players' and 'ball' tracks
+        team_assignments: Dict mapping player_id to team number
+        fps: Frames per second
+        
+    Returns:
+        List of pass events: [{"type": "pass", "frame": int, "timestamp": float,
+                               "team": int, "passer": int, "receiver": int}, ...]
+    """
+    pass_events = []
+    
     if not tracks.get('players') or not tracks.get('ball') or not team_assignments:
-        return pass_counts
+        return pass_events
     
     max_pass_frames = int(MAX_PASS_TIME * fps)
     last_possessor = None
@@ -78,10 +114,14 @@ def detect_passes(tracks, team_assignments, fps):
                         
                         if ball_travel_distance >= MIN_PASS_DISTANCE:
                             # Valid pass completed
-                            if current_team == 1:
-                                pass_counts["team1"] += 1
-                            elif current_team == 2:
-                                pass_counts["team2"] += 1
+                            pass_events.append({
+                                "type": "pass",
+                                "frame": frame_num,
+                                "timestamp": round(frame_num / fps, 1),
+                                "team": int(current_team),
+                                "passer": int(last_possessor),
+                                "receiver": int(current_possessor)
+                            })
         
         # Update possession tracking with stability requirement
         if current_possessor:
@@ -105,4 +145,4 @@ def detect_passes(tracks, team_assignments, fps):
             # No possessor, reset all counters
             current_possessor_frames.clear()
     
-    return pass_counts
\ No newline at end of file
+    return pass_events
\ No newline at end of file
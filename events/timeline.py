@@ -0,0 +1,253 @@
+from bisect import bisect_left, bisect_right
+
+
+def _run_length_encode(values, skip=None):
+    """
+    Collapse a per-frame sequence into [value, start, end) runs.
+
+    Args:
+        values: Per-frame values
+        skip: Value whose runs are dropped (e.g. -1 for "no player")
+
+    Returns:
+        List of (value, start_frame, end_frame) tuples, end exclusive
+    """
+    runs = []
+    start = 0
+    for frame_num in range(1, len(values) + 1):
+        if frame_num == len(values) or values[frame_num] != values[start]:
+            if values[start] != skip:
+                runs.append((values[start], start, frame_num))
+            start = frame_num
+    return runs
+
+
+class _IntervalIndex:
+    """
+    Sorted, non-overlapping [start, end) intervals with prefix sums of their
+    lengths, so covered-frame counts over any range are two binary searches.
+    """
+    def __init__(self, intervals):
+        self.starts = [start for start, _ in intervals]
+        self.ends = [end for _, end in intervals]
+        self.prefix = [0]
+        for start, end in intervals:
+            self.prefix.append(self.prefix[-1] + end - start)
+
+    def covered_before(self, frame):
+        # Frames covered by intervals in [0, frame)
+        idx = bisect_right(self.starts, frame) - 1
+        if idx < 0:
+            return 0
+        return self.prefix[idx] + min(frame, self.ends[idx]) - self.starts[idx]
+
+    def covered(self, start, end):
+        return self.covered_before(end) - self.covered_before(start)
+
+    def overlapping(self, start, end):
+        # Indices of intervals intersecting [start, end)
+        first = bisect_right(self.ends, start)
+        last = bisect_left(self.starts, end)
+        return range(first, last)
+
+
+class PossessionTimeline:
+    """
+    Indexed possession spells and events for one match.
+
+    Team and player spells are run-length encoded from the per-frame ball
+    control arrays and kept as sorted interval indexes per team / player.
+    Events are kept sorted by frame, globally and per player. All queries
+    take times in seconds and run in O(log n + k).
+    """
+    def __init__(self, fps, num_frames, team_spells, player_spells, events):
+        self.fps = fps
+        self.num_frames = num_frames
+        self.team_spells = [tuple(spell) for spell in team_spells]
+        self.player_spells = [tuple(spell) for spell in player_spells]
+        self.events = sorted(events, key=lambda e: e["frame"])
+
+        self.team_index = {}
+        for team in {spell[0] for spell in self.team_spells}:
+            self.team_index[team] = _IntervalIndex([(s, e) for t, s, e in self.team_spells if t == team])
+
+        self.player_index = {}
+        for player_id in {spell[0] for spell in self.player_spells}:
+            self.player_index[player_id] = _IntervalIndex(
+                [(s, e) for p, _, s, e in self.player_spells if p == player_id])
+
+        # Every spell (team and player) ordered by length for duration queries
+        self.spells_by_length = sorted(
+            [(e - s, "team", t, None, s, e) for t, s, e in self.team_spells] +
+            [(e - s, "player", t, p, s, e) for p, t, s, e in self.player_spells],
+            key=lambda spell: spell[0])
+        self.spell_lengths = [spell[0] for spell in self.spells_by_length]
+
+        self.event_frames = [event["frame"] for event in self.events]
+        self.player_events = {}
+        for event in self.events:
+            player_ids = {event.get(key) for key in ("passer", "receiver", "player_id")}
+            for player_id in player_ids - {None}:
+                self.player_events.setdefault(player_id, []).append(event)
+        self.player_event_frames = {p: [e["frame"] for e in evs] for p, evs in self.player_events.items()}
+
+    @classmethod
+    def from_frames(cls, team_ball_control, player_ball_control, fps, events=()):
+        """
+        Build a timeline from per-frame possession arrays.
+
+        Args:
+            team_ball_control: Team in possession per frame (0 = unknown)
+            player_ball_control: Player id in possession per frame (-1 = none)
+            fps: Frames per second
+            events: Goal/pass event dicts with at least "frame"
+
+        Returns:
+            PossessionTimeline
+        """
+        team_ball_control = [int(team) for team in team_ball_control]
+        player_ball_control = [int(player_id) for player_id in player_ball_control]
+
+        team_spells = _run_length_encode(team_ball_control, skip=0)
+        player_spells = [(player_id, team_ball_control[start], start, end)
+                         for player_id, start, end in _run_length_encode(player_ball_control, skip=-1)]
+
+        return cls(fps, len(team_ball_control), team_spells, player_spells, list(events))
+
+    def _frame(self, seconds, default):
+        if seconds is None:
+            return default
+        return max(0, min(self.num_frames, int(round(seconds * self.fps))))
+
+    def _frame_range(self, t1, t2):
+        return self._frame(t1, 0), self._frame(t2, self.num_frames)
+
+    @property
+    def duration_sec(self):
+        return self.num_frames / self.fps if self.fps else 0.0
+
+    def half_range(self, half):
+        """
+        Return the (t1, t2) range in seconds of the first or second half of the footage.
+        """
+        midpoint = self.duration_sec / 2
+        return (0.0, midpoint) if half == 1 else (midpoint, self.duration_sec)
+
+    def possession_pct(self, t1=None, t2=None):
+        """
+        Possession percentages between t1 and t2 seconds.
+
+        Returns:
+            Dict: {"team1_pct": float, "team2_pct": float, "unknown_pct": float}
+        """
+        start, end = self._frame_range(t1, t2)
+        total = end - start
+        if total <= 0:
+            return {"team1_pct": 0.0, "team2_pct": 0.0, "unknown_pct": 100.0}
+
+        team1 = self.team_index[1].covered(start, end) if 1 in self.team_index else 0
+        team2 = self.team_index[2].covered(start, end) if 2 in self.team_index else 0
+        team1_pct = round(team1 / total * 100, 1)
+        team2_pct = round(team2 / total * 100, 1)
+
+        return {
+            "team1_pct": team1_pct,
+            "team2_pct": team2_pct,
+            "unknown_pct": round(100 - team1_pct - team2_pct, 1)
+        }
+
+    def player_possession_sec(self, player_id, t1=None, t2=None):
+        """
+        Seconds of possession by a player between t1 and t2.
+        """
+        if player_id not in self.player_index:
+            return 0.0
+        start, end = self._frame_range(t1, t2)
+        return self.player_index[player_id].covered(start, end) / self.fps
+
+    def spells_between(self, t1=None, t2=None, team=None):
+        """
+        Team possession spells overlapping [t1, t2).
+
+        Returns:
+            List of {"team": int, "start": float, "end": float} in seconds
+        """
+        start, end = self._frame_range(t1, t2)
+        teams = [team] if team is not None else sorted(self.team_index)
+        spells = []
+        for team_id in teams:
+            index = self.team_index.get(team_id)
+            if index is None:
+                continue
+            for i in index.overlapping(start, end):
+                spells.append(self._spell_dict("team", team_id, None, index.starts[i], index.ends[i]))
+        return sorted(spells, key=lambda spell: spell["start"])
+
+    def spells_longer_than(self, seconds, team=None, kind="team"):
+        """
+        Possession spells lasting more than the given number of seconds.
+
+        Args:
+            seconds: Minimum spell duration
+            team: Optional team filter
+            kind: "team" or "player" spells
+
+        Returns:
+            List of spell dicts, longest first
+        """
+        first = bisect_right(self.spell_lengths, seconds * self.fps)
+        spells = []
+        for _, spell_kind, team_id, player_id, start, end in reversed(self.spells_by_length[first:]):
+            if spell_kind != kind or (team is not None and team_id != team):
+                continue
+            spells.append(self._spell_dict(spell_kind, team_id, player_id, start, end))
+        return spells
+
+    def events_between(self, t1=None, t2=None, event_type=None):
+        """
+        Events in [t1, t2), optionally restricted to one type ("goal" or "pass").
+        """
+        start, end = self._frame_range(t1, t2)
+        events = self.events[bisect_left(self.event_frames, start):bisect_left(self.event_frames, end)]
+        if event_type is not None:
+            events = [event for event in events if event.get("type") == event_type]
+        return events
+
+    def passes_by(self, player_id, t1=None, t2=None, as_receiver=False):
+        """
+        Passes made (or received) by a player in [t1, t2).
+        """
+        if player_id not in self.player_events:
+            return []
+        start, end = self._frame_range(t1, t2)
+        frames = self.player_event_frames[player_id]
+        events = self.player_events[player_id][bisect_left(frames, start):bisect_left(frames, end)]
+        key = "receiver" if as_receiver else "passer"
+        return [event for event in events if event.get("type") == "pass" and event.get(key) == player_id]
+
+    def _spell_dict(self, kind, team, player_id, start, end):
+        spell = {
+            "team": team,
+            "start": round(start / self.fps, 2),
+            "end": round(end / self.fps, 2),
+            "duration": round((end - start) / self.fps, 2)
+        }
+        if kind == "player":
+            spell["player"] = player_id
+        return spell
+
+    def to_dict(self):
+        """
+        Compact JSON-serializable form, stored in summary.json.
+        """
+        return {
+            "fps": self.fps,
+            "frames": self.num_frames,
+            "team_spells": [[int(t), int(s), int(e)] for t, s, e in self.team_spells],
+            "player_spells": [[int(p), int(t), int(s), int(e)] for p, t, s, e in self.player_spells],
+            "events": self.events
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["fps"], data["frames"], data["team_spells"], data["player_spells"], data["events"])
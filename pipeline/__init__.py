@@ -0,0 +1,3 @@
+from .pipeline import Pipeline, PipelineRun, Stage
+from .shared_frame_executor import SharedFrameExecutor
+from .football_pipeline import FootballPipeline, OBJECT_TYPES
\ No newline at end of file
@@ -0,0 +1,366 @@
+import os
+import sys
+sys.path.append('../')
+from utils import decode_video_parallel, get_video_info, measure_distance
+from team_assigner import TeamAssigner
+from player_ball_assigner import PlayerBallAssigner
+from camera_movement_estimator import CameraMovementEstimator
+from view_transformer import ViewTransformer
+from scene_detector import SceneDetector
+from events.goal_detector import detect_goals
+from events.pass_detector import detect_pass_events, count_passes
+from events.ball_flight import detect_flight_passes, CONTACT_DISTANCE
+from events.possession import calculate_possession, POSSESSION_DISTANCE
+from events.timeline import PossessionTimeline
+from spatial_index import SpatialIndex, proximity_summary
+from trackers import Tracker
+from trackers.detector_backend import DETECTOR_IMGSZ
+from .pipeline import Pipeline
+from .shared_frame_executor import SharedFrameExecutor
+
+OBJECT_TYPES = ("players", "referees", "ball")
+
+# "flight" segments the ball trajectory; "possession" uses the per-frame possessor changes
+PASS_DETECTOR = os.getenv('PASS_DETECTOR', 'flight')
+# Widest player-ball distance any event stage links over (possession, or flight pass contacts)
+TEAM_ASSIGNMENT_DISTANCE = max(POSSESSION_DISTANCE, CONTACT_DISTANCE)
+
+
+def _copy_tracks(object_tracks):
+    # Stages add fields to track dicts, so each one writes to its own copies
+    return [{track_id: dict(track_info) for track_id, track_info in frame.items()} for frame in object_tracks]
+
+
+class FootballPipeline(Pipeline):
+    """
+    The match analysis as a lazy stage graph.
+
+    Position outputs are per object type ("positions.players",
+    "positions_adjusted.referees", "positions_transformed.ball", ...), so
+    asking for player positions never touches referees. Team colours for
+    possession and events are only computed for players that get within
+    TEAM_ASSIGNMENT_DISTANCE of the ball; "player_teams" assigns every player.
+
+    Stages never modify their inputs: "tracks" stays the tracker's output,
+    and each stage that adds fields works on its own copy, so results do
+    not depend on the order outputs are requested in. "annotated_tracks"
+    merges positions, teams and ball possession into one tracks dict.
+    Nothing is kept on the pipeline between runs: every run fits its own
+    TeamAssigner (from kit_library and fixture, when given).
+
+    tracker only serves the "track" stage; it may be None for runs started
+    with start_shared, whose detection process builds its own.
+
+    Inputs: video_path. Main outputs: "summary", "annotated_tracks",
+    "timeline", "player_teams", "possession", "pass_events", "goals",
+    "proximity".
+
+    With detect_scenes, "scenes" splits the broadcast into shots: tracking
+    resets at cuts, and close-ups and replays get no detection, no camera
+    movement and no ball, so event stages ignore them.
+    """
+    def __init__(self, tracker, kit_library=None, fixture=None, track_stub_path=None,
+                 camera_movement_stub_path=None, estimate_camera_movement=True, detect_scenes=True):
+        super().__init__()
+        self.tracker = tracker
+        self.kit_library = kit_library
+        self.fixture = fixture
+        self.track_stub_path = track_stub_path
+        self.camera_movement_stub_path = camera_movement_stub_path
+        self.estimate_camera_movement = estimate_camera_movement
+        self.detect_scenes = detect_scenes
+
+        self.add_stage("video_info", self.get_fps, ["video_path"], ["fps"])
+        self.add_stage("decode", self.decode, ["video_path"], ["frames", "inference_frames", "gray_frames"])
+        self.add_stage("frame_info", self.get_frame_info, ["frames"], ["num_frames", "frame_shape"])
+        self.add_stage("scenes", self.get_scenes, ["inference_frames", "fps"], ["scenes"])
+        self.add_stage("track", self.track, ["frames", "inference_frames", "scenes"], ["tracks"])
+        self.add_stage("interpolate_ball", self.interpolate_ball, ["tracks", "scenes"], ["ball_track"])
+        self.add_stage("camera_movement", self.get_camera_movement, ["frames", "gray_frames", "scenes"],
+                       ["camera_movement_estimator", "camera_movement"])
+
+        for object in OBJECT_TYPES:
+            # The ball is positioned after interpolation
+            inputs = ["ball_track"] if object == "ball" else ["tracks"]
+            self.add_stage(f"position.{object}", self.position_stage(object),
+                           inputs, [f"positions.{object}"])
+            self.add_stage(f"position_adjusted.{object}", self.position_adjusted_stage(object),
+                           [f"positions.{object}", "camera_movement_estimator", "camera_movement"],
+                           [f"positions_adjusted.{object}"])
+            self.add_stage(f"position_transformed.{object}", self.position_transformed_stage(object),
+                           [f"positions_adjusted.{object}"], [f"positions_transformed.{object}"])
+
+        self.add_stage("player_colors", self.get_player_colors, [], ["player_colors"])
+        self.add_stage("fit_team_colors", self.fit_team_colors, ["frames", "tracks", "player_colors"],
+                       ["team_assigner", "team_assignment_success"])
+        self.add_stage("player_teams", self.assign_player_teams, ["team_assigner", "frames", "tracks"], ["player_teams"])
+        self.add_stage("ball_control", self.assign_ball_control, ["tracks", "ball_track"], ["player_ball_control"])
+        self.add_stage("team_ball_control", self.get_team_ball_control,
+                       ["player_ball_control", "team_assigner", "frames", "tracks"], ["team_ball_control"])
+        self.add_stage("team_assignments", self.get_team_assignments,
+                       ["tracks", "ball_track", "team_assigner", "frames"], ["team_assignments"])
+        self.add_stage("goals", self.detect_goals, ["ball_track", "team_ball_control", "frame_shape", "fps"], ["goals"])
+        self.add_stage("passes", self.detect_passes, ["tracks", "ball_track", "team_assignments", "fps"], ["pass_events"])
+        self.add_stage("possession", self.calculate_possession, ["tracks", "ball_track", "team_assignments"], ["possession"])
+        self.add_stage("timeline", self.build_timeline,
+                       ["team_ball_control", "player_ball_control", "fps", "goals", "pass_events"], ["timeline"])
+        self.add_stage("spatial_index", self.build_spatial_index,
+                       ["positions_transformed.players", "player_teams", "player_ball_control"], ["spatial_index"])
+        self.add_stage("proximity", self.get_proximity, ["spatial_index"], ["proximity"])
+        self.add_stage("summary", self.build_summary,
+                       ["goals", "pass_events", "possession", "timeline", "num_frames", "fps"], ["summary"])
+        self.add_stage("annotated_tracks", self.annotate_tracks,
+                       [*[f"positions_transformed.{object}" for object in OBJECT_TYPES],
+                        "player_teams", "player_ball_control", "team_assigner"], ["annotated_tracks"])
+
+    def start_shared(self, video_path, model_path, **detector_options):
+        """
+        Start a run whose frames, tracks, camera movement and player colours
+        come from a SharedFrameExecutor, i.e. computed concurrently.
+
+        The detection process builds its own Tracker from model_path and
+        detector_options, so the pipeline's tracker may be None here.
+
+        Returns:
+            (run, executor); call executor.close() once the run is finished
+        """
+        executor = SharedFrameExecutor(video_path,
+                                       model_path,
+                                       track_stub_path=self.track_stub_path,
+                                       camera_movement_stub_path=self.camera_movement_stub_path,
+                                       detect_scenes=self.detect_scenes,
+                                       estimate_camera_movement=self.estimate_camera_movement,
+                                       detector_options=detector_options)
+        try:
+            results = executor.run()
+        except Exception:
+            executor.close()
+            raise
+
+        frames = results["frames"]
+        run = self.start(video_path=video_path,
+                         frames=frames,
+                         scenes=results["scenes"],
+                         tracks=results["tracks"],
+                         player_colors=results["player_colors"],
+                         camera_movement_estimator=CameraMovementEstimator(frames[0]),
+                         camera_movement=results["camera_movement"])
+        return run, executor
+
+    def get_fps(self, video_path):
+        return get_video_info(video_path)["fps"]
+
+    def decode(self, video_path):
+        # Full-res BGR for the ball refiner, team colours and drawing; detector-sized
+        # frames for detection and scene detection; full-res grey (its feature mask
+        # is in full-res pixels) only when camera movement is estimated
+        info = get_video_info(video_path)
+        inference_size = (DETECTOR_IMGSZ, round(info["height"] * DETECTOR_IMGSZ / info["width"]))
+        outputs = ("bgr", "inference", "gray") if self.estimate_camera_movement else ("bgr", "inference")
+        decoded = decode_video_parallel(video_path, outputs=outputs, inference_size=inference_size)
+        return decoded["bgr"], decoded["inference"], decoded.get("gray")
+
+    def get_frame_info(self, frames):
+        return len(frames), frames[0].shape
+
+    def get_scenes(self, inference_frames, fps):
+        if not self.detect_scenes:
+            return None
+        # Scene features are computed on a thumbnail, so detector-sized frames suffice
+        scenes = SceneDetector(fps).detect_scenes(inference_frames)
+        skipped = len(inference_frames) - sum(scenes["live"])
+        print(f"Scene detection: {len(scenes['cuts'])} cuts, {skipped} non-live frames skipped")
+        return scenes
+
+    def track(self, frames, inference_frames, scenes):
+        return self.tracker.get_object_tracks(frames,
+                                              read_from_stub=self.track_stub_path is not None,
+                                              stub_path=self.track_stub_path,
+                                              scenes=scenes,
+                                              detection_frames=inference_frames)
+
+    def interpolate_ball(self, tracks, scenes):
+        if scenes is None:
+            return Tracker.interpolate_ball_positions(tracks["ball"])
+
+        # Each live shot on its own: the ball is never carried across a cut,
+        # nor into close-ups and replays, which stay empty
+        ball_tracks = [{} for _ in tracks["ball"]]
+        for shot in scenes["shots"]:
+            shot_tracks = tracks["ball"][shot["start"]:shot["end"]]
+            if shot["label"] == "live" and any(1 in ball_frame for ball_frame in shot_tracks):
+                ball_tracks[shot["start"]:shot["end"]] = Tracker.interpolate_ball_positions(shot_tracks)
+        return ball_tracks
+
+    def get_camera_movement(self, frames, gray_frames, scenes):
+        camera_movement_estimator = CameraMovementEstimator(frames[0])
+        if not self.estimate_camera_movement:
+            return camera_movement_estimator, [[0, 0]] * len(frames)
+        camera_movement = camera_movement_estimator.get_camera_movement(
+            gray_frames if gray_frames is not None else frames,
+            read_from_stub=self.camera_movement_stub_path is not None,
+            stub_path=self.camera_movement_stub_path,
+            cuts=scenes["cuts"] if scenes is not None else None)
+        return camera_movement_estimator, camera_movement
+
+    def position_stage(self, object):
+        def add_position(tracks):
+            # The ball stage gets the interpolated ball track itself
+            object_tracks = _copy_tracks(tracks if object == "ball" else tracks[object])
+            Tracker.add_position_to_tracks({object: object_tracks})
+            return object_tracks
+        return add_position
+
+    def position_adjusted_stage(self, object):
+        def add_position_adjusted(object_tracks, camera_movement_estimator, camera_movement):
+            object_tracks = _copy_tracks(object_tracks)
+            camera_movement_estimator.add_adjust_positions_to_tracks({object: object_tracks}, camera_movement)
+            return object_tracks
+        return add_position_adjusted
+
+    def position_transformed_stage(self, object):
+        def add_position_transformed(object_tracks):
+            object_tracks = _copy_tracks(object_tracks)
+            ViewTransformer().add_transformed_position_to_tracks({object: object_tracks})
+            return object_tracks
+        return add_position_transformed
+
+    def get_player_colors(self):
+        # Extracted lazily by the run's TeamAssigner, unless a
+        # SharedFrameExecutor already gave them as a run input
+        return {}
+
+    def fit_team_colors(self, frames, tracks, player_colors):
+        team_assigner = TeamAssigner(self.kit_library, self.fixture)
+        team_assigner.player_colors.update(player_colors)
+        if team_assigner.has_prototypes():
+            print("Team assignment from kit library")
+            return team_assigner, True
+
+        # Find best frame with most players for team assignment
+        best_frame = 0
+        max_players = 0
+        for i, player_frame in enumerate(tracks['players']):
+            if len(player_frame) > max_players:
+                max_players = len(player_frame)
+                best_frame = i
+
+        team_assignment_success = False
+        if max_players >= 4:  # Need at least 4 players for reliable team assignment
+            try:
+                team_assigner.assign_team_color(frames[best_frame], tracks['players'][best_frame])
+                team_assignment_success = True
+                print(f"Team assignment successful with {max_players} players in frame {best_frame}")
+            except Exception as e:
+                print(f"Team assignment failed: {e}")
+
+        if not team_assignment_success:
+            # Create fallback team assignment
+            team_assigner.team_colors[1] = [255, 0, 0]  # Red team
+            team_assigner.team_colors[2] = [0, 0, 255]  # Blue team
+            print("Using fallback team colors due to assignment failure")
+
+        return team_assigner, team_assignment_success
+
+    def assign_player_teams(self, team_assigner, frames, tracks):
+        player_teams = {}
+        for frame_num, player_track in enumerate(tracks['players']):
+            for player_id, track in player_track.items():
+                player_teams[player_id] = team_assigner.get_player_team(frames[frame_num], track['bbox'], player_id)
+        return player_teams
+
+    def get_player_team(self, team_assigner, frames, tracks, player_id):
+        # Classify from the player's first appearance, as a full pass over the frames would
+        if player_id not in team_assigner.player_team_dict:
+            for frame_num, player_track in enumerate(tracks['players']):
+                if player_id in player_track:
+                    team_assigner.get_player_team(frames[frame_num], player_track[player_id]['bbox'], player_id)
+                    break
+        return team_assigner.player_team_dict[player_id]
+
+    def assign_ball_control(self, tracks, ball_track):
+        player_assigner = PlayerBallAssigner()
+        player_ball_control = []
+        for frame_num, player_track in enumerate(tracks['players']):
+            assigned_player = -1
+            if ball_track[frame_num] and 1 in ball_track[frame_num]:
+                ball_bbox = ball_track[frame_num][1]['bbox']
+                assigned_player = player_assigner.assign_ball_to_player(player_track, ball_bbox)
+            player_ball_control.append(assigned_player)
+        return player_ball_control
+
+    def get_team_ball_control(self, player_ball_control, team_assigner, frames, tracks):
+        team_ball_control = []
+        for assigned_player in player_ball_control:
+            if assigned_player != -1:
+                team_ball_control.append(int(self.get_player_team(team_assigner, frames, tracks, assigned_player)))
+            else:
+                # Use last known possession if available
+                team_ball_control.append(team_ball_control[-1] if team_ball_control else 0)
+        return team_ball_control
+
+    def get_team_assignments(self, tracks, ball_track, team_assigner, frames):
+        # Players never within TEAM_ASSIGNMENT_DISTANCE of the ball cannot be a
+        # possessor, passer or receiver, so they are not classified
+        near_ball = set()
+        for player_track, ball_frame in zip(tracks['players'], ball_track):
+            if not ball_frame or 1 not in ball_frame:
+                continue
+            x1, y1, x2, y2 = ball_frame[1]['bbox']
+            ball_position = ((x1 + x2) / 2, (y1 + y2) / 2)
+            for player_id, track in player_track.items():
+                bbox = track['bbox']
+                player_pos = ((bbox[0] + bbox[2]) / 2, bbox[3])
+                if measure_distance(player_pos, ball_position) <= TEAM_ASSIGNMENT_DISTANCE:
+                    near_ball.add(player_id)
+
+        return {player_id: self.get_player_team(team_assigner, frames, tracks, player_id)
+                for player_id in near_ball}
+
+    def detect_goals(self, ball_track, team_ball_control, frame_shape, fps):
+        return detect_goals(ball_track, team_ball_control, frame_shape, fps)
+
+    def detect_passes(self, tracks, ball_track, team_assignments, fps):
+        if PASS_DETECTOR == 'flight':
+            return detect_flight_passes({'players': tracks['players'], 'ball': ball_track}, team_assignments, fps)
+        return detect_pass_events({'players': tracks['players'], 'ball': ball_track}, team_assignments, fps)
+
+    def calculate_possession(self, tracks, ball_track, team_assignments):
+        return calculate_possession({'players': tracks['players'], 'ball': ball_track}, ball_track, team_assignments)
+
+    def build_timeline(self, team_ball_control, player_ball_control, fps, goals, pass_events):
+        return PossessionTimeline.from_frames(team_ball_control, player_ball_control, fps, goals + pass_events)
+
+    def build_spatial_index(self, player_tracks, player_teams, player_ball_control):
+        return SpatialIndex.from_tracks(player_tracks, teams=player_teams, carriers=player_ball_control)
+
+    def get_proximity(self, spatial_index):
+        return proximity_summary(spatial_index)
+
+    def annotate_tracks(self, players, referees, ball, player_teams, player_ball_control, team_assigner):
+        players = _copy_tracks(players)
+        for player_track, assigned_player in zip(players, player_ball_control):
+            for player_id, track in player_track.items():
+                track['team'] = player_teams[player_id]
+                track['team_color'] = team_assigner.team_colors[track['team']]
+            if assigned_player != -1:
+                player_track[assigned_player]['has_ball'] = True
+        return {"players": players, "referees": referees, "ball": ball}
+
+    def build_summary(self, goals, pass_events, possession, timeline, num_frames, fps):
+        return {
+            "version": "1.0",
+            "goals": {
+                "team1": len([g for g in goals if g["team"] == 1]),
+                "team2": len([g for g in goals if g["team"] == 2]),
+                "events": goals
+            },
+            "passes": count_passes(pass_events),
+            "possession": possession,
+            "timeline": timeline.to_dict(),
+            "video": {
+                "frames": num_frames,
+                "fps": round(fps, 1),
+                "duration_sec": round(num_frames / fps, 1)
+            }
+        }
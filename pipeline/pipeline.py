@@ -0,0 +1,103 @@
+class Stage:
+    def __init__(self, name, func, inputs, outputs):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+
+
+class PipelineRun:
+    """
+    One run of a pipeline. Every stage executes at most once per run and
+    its outputs are memoized, so later requests reuse earlier results.
+    """
+    def __init__(self, pipeline, inputs):
+        self.pipeline = pipeline
+        self.results = dict(inputs)
+        self.executed = []
+
+    def get(self, *requested):
+        """
+        Compute the requested outputs and the stages they depend on.
+
+        Returns:
+            The single output, or a dict of outputs if several were requested
+        """
+        for stage in self.pipeline.plan(requested, available=self.results):
+            values = stage.func(*[self.results[name] for name in stage.inputs])
+            if len(stage.outputs) == 1:
+                values = (values,)
+            self.results.update(zip(stage.outputs, values))
+            self.executed.append(stage.name)
+
+        if len(requested) == 1:
+            return self.results[requested[0]]
+        return {name: self.results[name] for name in requested}
+
+
+class Pipeline:
+    """
+    DAG of stages with declared inputs and outputs, evaluated lazily:
+    only the stages the requested outputs depend on are run.
+    """
+    def __init__(self):
+        self.stages = {}
+        self.producers = {}
+
+    def add_stage(self, name, func, inputs=(), outputs=()):
+        for output in outputs:
+            if output in self.producers:
+                raise ValueError(f"Output '{output}' is already produced by stage '{self.producers[output]}'")
+        self.stages[name] = Stage(name, func, inputs, outputs)
+        for output in outputs:
+            self.producers[output] = name
+
+    def plan(self, requested, available=()):
+        """
+        Stages needed for the requested outputs, in dependency order.
+
+        Args:
+            requested: Output names
+            available: Names that are already computed or given as inputs
+
+        Returns:
+            List of Stage
+        """
+        ordered = []
+        done = set()
+        visiting = set()
+
+        def visit(name):
+            if name in available:
+                return
+            if name not in self.producers:
+                raise ValueError(f"No stage produces '{name}' and it was not given as an input")
+            stage_name = self.producers[name]
+            if stage_name in done:
+                return
+            if stage_name in visiting:
+                raise ValueError(f"Dependency cycle through stage '{stage_name}'")
+            visiting.add(stage_name)
+            for input_name in self.stages[stage_name].inputs:
+                visit(input_name)
+            visiting.discard(stage_name)
+            done.add(stage_name)
+            ordered.append(self.stages[stage_name])
+
+        for name in requested:
+            visit(name)
+        return ordered
+
+    def start(self, **inputs):
+        return PipelineRun(self, inputs)
+
+    def run(self, requested, **inputs):
+        """
+        Compute the requested outputs in a fresh run.
+
+        Returns:
+            Dict of output name -> value
+        """
+        pipeline_run = self.start(**inputs)
+        results = pipeline_run.get(*requested)
+        return results if len(requested) > 1 else {requested[0]: results}
@@ -0,0 +1,218 @@
+import os
+import queue
+import sys
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+sys.path.append('../')
+from utils import get_video_info
+from scene_detector import SceneDetector
+
+# Start method for stage processes; spawn avoids forking a parent that may hold torch/OpenMP threads
+EXECUTOR_START_METHOD = os.getenv('EXECUTOR_START_METHOD', 'spawn')
+
+
+def _attach_frames(shm_name, shape):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    return shm, frames
+
+
+def _camera_movement_worker(shm_name, shape, stub_path, cuts, result_queue):
+    from camera_movement_estimator import CameraMovementEstimator
+
+    start = time.perf_counter()
+    shm, frames = _attach_frames(shm_name, shape)
+    try:
+        camera_movement_estimator = CameraMovementEstimator(frames[0])
+        camera_movement = camera_movement_estimator.get_camera_movement(
+            frames,
+            read_from_stub=stub_path is not None,
+            stub_path=stub_path,
+            cuts=cuts)
+        camera_movement = [[float(x), float(y)] for x, y in camera_movement]
+    finally:
+        del frames
+        shm.close()
+    result_queue.put(("camera_movement", camera_movement, time.perf_counter() - start))
+
+
+def _detection_worker(shm_name, shape, model_path, detector_options, stub_path, scenes, track_queue, result_queue):
+    from trackers import Tracker
+
+    start = time.perf_counter()
+    shm, frames = _attach_frames(shm_name, shape)
+
+    # Stream player boxes to the colour stage as each frame is tracked
+    def publish_frame(frame_num, tracks):
+        players = {int(player_id): info['bbox'] for player_id, info in tracks['players'][frame_num].items()}
+        track_queue.put((frame_num, players))
+
+    try:
+        tracker = Tracker(model_path, **detector_options)
+        tracks = tracker.get_object_tracks(list(frames),
+                                           read_from_stub=stub_path is not None,
+                                           stub_path=stub_path,
+                                           frame_callback=publish_frame,
+                                           scenes=scenes)
+    finally:
+        track_queue.put(None)
+        del frames
+        shm.close()
+    result_queue.put(("tracks", tracks, time.perf_counter() - start))
+
+
+def _team_color_worker(shm_name, shape, track_queue, result_queue):
+    from team_assigner import TeamAssigner
+
+    start = time.perf_counter()
+    shm, frames = _attach_frames(shm_name, shape)
+    team_assigner = TeamAssigner()
+    player_colors = {}
+    try:
+        # Colour from each player's first appearance, as TeamAssigner.get_player_team does
+        while True:
+            message = track_queue.get()
+            if message is None:
+                break
+            frame_num, players = message
+            for player_id, bbox in players.items():
+                if player_id not in player_colors:
+                    player_colors[player_id] = team_assigner.get_player_color(frames[frame_num], bbox)
+    finally:
+        del frames
+        shm.close()
+    result_queue.put(("player_colors", player_colors, time.perf_counter() - start))
+
+
+class SharedFrameExecutor:
+    """
+    Decodes a video once into shared memory and runs camera movement,
+    detection/tracking and player colour extraction in separate processes
+    that map the same frames instead of receiving pickled copies.
+
+    Detection streams each tracked frame's player boxes to the colour
+    process, so colours are extracted while inference is still running.
+    Only the (small) per-frame results cross process boundaries.
+
+    With detect_scenes, shots are found before the workers start so
+    detection skips non-live frames and both stages reset at cuts. Without
+    estimate_camera_movement no camera process is started and the movement
+    is zero for every frame. detector_options (backend, imgsz, int8,
+    intra_op_threads, inter_op_threads) are passed to the detection
+    process's Tracker.
+    """
+    def __init__(self, video_path, model_path, track_stub_path=None, camera_movement_stub_path=None,
+                 detect_scenes=True, estimate_camera_movement=True, detector_options=None):
+        self.video_path = video_path
+        self.model_path = model_path
+        self.detector_options = detector_options or {}
+        self.track_stub_path = track_stub_path
+        self.camera_movement_stub_path = camera_movement_stub_path
+        self.detect_scenes = detect_scenes
+        self.estimate_camera_movement = estimate_camera_movement
+        self.shm = None
+        self.frames = None
+        self.timings = {}
+
+    def decode(self):
+        info = get_video_info(self.video_path)
+        shape = (info["frames"], info["height"], info["width"], 3)
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        frames = np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf)
+
+        cap = cv2.VideoCapture(self.video_path)
+        num_frames = 0
+        while num_frames < shape[0]:
+            # Decode straight into the shared buffer
+            ret, _ = cap.read(frames[num_frames])
+            if not ret:
+                break
+            num_frames += 1
+        cap.release()
+
+        # The container's frame count can overstate the decodable frames
+        self.frames = frames[:num_frames]
+        return self.frames
+
+    def run(self):
+        """
+        Run the stages concurrently.
+
+        Returns:
+            Dict with "frames" (shared array, valid until close()), "scenes"
+            (None without detect_scenes), "tracks", "camera_movement" and
+            "player_colors" ({player_id: color})
+        """
+        start = time.perf_counter()
+        frames = self.decode()
+        self.timings["decode"] = time.perf_counter() - start
+        shape = frames.shape
+
+        scenes = None
+        if self.detect_scenes:
+            start_scenes = time.perf_counter()
+            scenes = SceneDetector(get_video_info(self.video_path)["fps"]).detect_scenes(frames)
+            self.timings["scenes"] = time.perf_counter() - start_scenes
+        cuts = scenes["cuts"] if scenes is not None else None
+
+        context = mp.get_context(EXECUTOR_START_METHOD)
+        result_queue = context.Queue()
+        track_queue = context.Queue()
+        results = {"frames": frames, "scenes": scenes}
+        processes = [
+            context.Process(target=_detection_worker,
+                            args=(self.shm.name, shape, self.model_path, self.detector_options,
+                                  self.track_stub_path, scenes, track_queue, result_queue)),
+            context.Process(target=_team_color_worker,
+                            args=(self.shm.name, shape, track_queue, result_queue)),
+        ]
+        if self.estimate_camera_movement:
+            processes.append(context.Process(target=_camera_movement_worker,
+                                             args=(self.shm.name, shape, self.camera_movement_stub_path, cuts, result_queue)))
+        else:
+            results["camera_movement"] = [[0, 0]] * len(frames)
+        for process in processes:
+            process.start()
+
+        # One result per process on top of the ones already known
+        num_results = len(results) + len(processes)
+        try:
+            # Drain results before joining so no worker blocks on a full pipe
+            while len(results) < num_results:
+                try:
+                    name, value, seconds = result_queue.get(timeout=1)
+                except queue.Empty:
+                    failed = [process.name for process in processes if process.exitcode not in (None, 0)]
+                    if failed:
+                        raise RuntimeError(f"Stage process(es) failed: {failed}")
+                    continue
+                results[name] = value
+                self.timings[name] = seconds
+        finally:
+            for process in processes:
+                if process.is_alive() and len(results) < num_results:
+                    process.terminate()
+                process.join()
+
+        self.timings["total"] = time.perf_counter() - start
+        return results
+
+    def close(self):
+        if self.shm is not None:
+            self.frames = None
+            self.shm.unlink()
+            try:
+                self.shm.close()
+            except BufferError:
+                # Frame views are still referenced; the mapping goes away with them
+                pass
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
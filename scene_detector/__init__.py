@@ -0,0 +1 @@
+from .scene_detector import SceneDetector
\ No newline at end of file
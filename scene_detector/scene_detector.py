@@ -0,0 +1,124 @@
+import os
+import cv2
+import numpy as np
+
+# Frames are reduced to this size before any analysis
+SCENE_FRAME_SIZE = (96, 54)
+# Histogram distance (Bhattacharyya, 0..1) that marks a hard cut
+CUT_THRESHOLD = float(os.getenv('CUT_THRESHOLD', '0.45'))
+# Lower distances close together (at most WIPE_MAX_GAP apart) over several frames mark a graphic wipe/dissolve
+WIPE_THRESHOLD = float(os.getenv('WIPE_THRESHOLD', '0.1'))
+WIPE_MIN_FRAMES = int(os.getenv('WIPE_MIN_FRAMES', '3'))
+WIPE_MAX_GAP = int(os.getenv('WIPE_MAX_GAP', '2'))
+# Fraction of pitch-green pixels above which a shot is a live wide shot
+LIVE_GREEN_RATIO = float(os.getenv('LIVE_GREEN_RATIO', '0.35'))
+# Replays between wipes are rarely longer than this
+MAX_REPLAY_SECONDS = float(os.getenv('MAX_REPLAY_SECONDS', '30'))
+
+
+class SceneDetector:
+    """
+    Cheap shot-boundary and live-play classifier for broadcast footage.
+
+    Works on tiny downscaled frames: HSV histograms for cut/wipe detection
+    and the fraction of pitch-green pixels for wide (live) versus close-up
+    or crowd shots. Shots bracketed by wipe transitions on both sides are
+    labelled replays; the wipes themselves are "transition" shots.
+    """
+    def __init__(self, fps=24):
+        self.fps = fps
+
+    def get_frame_features(self, frame):
+        small = cv2.resize(frame, SCENE_FRAME_SIZE, interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+
+        hist = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+        cv2.normalize(hist, hist)
+
+        green = cv2.inRange(hsv, (35, 60, 40), (85, 255, 255))
+        green_ratio = float(np.count_nonzero(green)) / green.size
+        return hist, green_ratio
+
+    def get_transitions(self, distances):
+        """
+        Hard cuts and gradual (wipe) transitions from consecutive-frame distances.
+
+        Args:
+            distances: distances[i] between frame i-1 and frame i
+
+        Returns:
+            (cuts, wipes): frames where a new shot starts after a cut, and
+            [start, end) frame ranges covered by a wipe
+        """
+        candidates = np.flatnonzero(distances > WIPE_THRESHOLD)
+        if len(candidates) == 0:
+            return [], []
+
+        # Group candidate frames that are close together into one transition
+        breaks = np.flatnonzero(np.diff(candidates) > WIPE_MAX_GAP) + 1
+        cuts, wipes = [], []
+        for group in np.split(candidates, breaks):
+            first, last = int(group[0]), int(group[-1])
+            # Without a strong change somewhere it is camera motion, not a transition
+            if distances[group].max() <= CUT_THRESHOLD:
+                continue
+            if last - first + 1 >= WIPE_MIN_FRAMES:
+                wipes.append((first, last))
+            else:
+                cuts.append(int(group[np.argmax(distances[group])]))
+        return cuts, wipes
+
+    def detect_scenes(self, frames):
+        """
+        Split frames into shots and mark which frames show live play.
+
+        Args:
+            frames: Video frames (BGR)
+
+        Returns:
+            Dict: {"cuts": [frame, ...], "shots": [{"start": int, "end": int,
+                   "label": "live" | "closeup" | "replay" | "transition"}, ...],
+                   "live": [bool per frame]}
+        """
+        num_frames = len(frames)
+        if num_frames == 0:
+            return {"cuts": [], "shots": [], "live": []}
+
+        hists = []
+        green_ratios = np.zeros(num_frames)
+        for frame_num, frame in enumerate(frames):
+            hist, green_ratios[frame_num] = self.get_frame_features(frame)
+            hists.append(hist)
+
+        # distances[i] compares frame i with frame i-1
+        distances = np.zeros(num_frames)
+        for frame_num in range(1, num_frames):
+            distances[frame_num] = cv2.compareHist(hists[frame_num - 1], hists[frame_num], cv2.HISTCMP_BHATTACHARYYA)
+
+        cuts, wipes = self.get_transitions(distances)
+        wipe_set = set(wipes)
+        wipe_starts = {start for start, _ in wipes}
+        wipe_ends = {end for _, end in wipes}
+        boundaries = sorted(set(cuts) | wipe_starts | wipe_ends)
+        max_replay_frames = int(MAX_REPLAY_SECONDS * self.fps)
+
+        shots = []
+        live = [False] * num_frames
+        starts = [0] + boundaries
+        ends = boundaries + [num_frames]
+        for start, end in zip(starts, ends):
+            if end <= start:
+                continue
+            if (start, end) in wipe_set:
+                label = "transition"
+            elif start in wipe_ends and end in wipe_starts and end - start <= max_replay_frames:
+                label = "replay"
+            elif np.median(green_ratios[start:end]) >= LIVE_GREEN_RATIO:
+                label = "live"
+            else:
+                label = "closeup"
+            shots.append({"start": start, "end": end, "label": label})
+            if label == "live":
+                live[start:end] = [True] * (end - start)
+
+        return {"cuts": boundaries, "shots": shots, "live": live}
@@ -0,0 +1 @@
+from .spatial_index import SpatialIndex, proximity_summary
@@ -0,0 +1,233 @@
+import os
+import numpy as np
+
+# Opponents within this distance (metres) of the ball carrier count as pressing
+PRESSURE_RADIUS = float(os.getenv('PRESSURE_RADIUS', '5'))
+# Frames per batched distance computation; bounds memory at CHUNK_FRAMES * slots^2 floats
+CHUNK_FRAMES = int(os.getenv('CHUNK_FRAMES', '512'))
+
+
+class SpatialIndex:
+    """
+    Frame-major index over player positions for batched proximity queries.
+
+    Every frame's players are packed into a fixed number of slots, so the
+    whole match is a (frames, slots, 2) array plus matching ids, teams and
+    a ball-carrier slot per frame. Queries work on blocks of frames with
+    single numpy operations rather than one measure_distance call per
+    pair. With ~25 players per frame this is cheaper than building a
+    KD-tree or grid for every frame.
+
+    Missing positions (off the transformed court area) are NaN and never
+    match a query.
+    """
+    def __init__(self, positions, ids, teams, carriers):
+        """
+        Args:
+            positions: (frames, slots, 2) float array, NaN where empty
+            ids: (frames, slots) int array, -1 where empty
+            teams: (frames, slots) int array, 0 where unknown
+            carriers: (frames,) slot of the ball carrier, -1 if none
+        """
+        self.positions = positions
+        self.ids = ids
+        self.teams = teams
+        self.carriers = carriers
+
+    @classmethod
+    def from_tracks(cls, player_tracks, position='position_transformed', teams=None, carriers=None):
+        """
+        Build the index from tracks["players"].
+
+        Args:
+            player_tracks: Per-frame {player_id: track_info}; 'team' and
+                'has_ball' are used when present
+            position: Track key holding the position to index
+            teams: Optional {player_id: team}, used instead of 'team'
+            carriers: Optional per-frame ball carrier id (-1 if none),
+                used instead of 'has_ball'
+
+        Returns:
+            SpatialIndex
+        """
+        num_frames = len(player_tracks)
+        num_slots = max((len(frame) for frame in player_tracks), default=0)
+
+        positions = np.full((num_frames, num_slots, 2), np.nan)
+        ids = np.full((num_frames, num_slots), -1, dtype=np.int64)
+        slot_teams = np.zeros((num_frames, num_slots), dtype=np.int64)
+        carrier_slots = np.full(num_frames, -1, dtype=np.int64)
+
+        for frame_num, player_frame in enumerate(player_tracks):
+            for slot, (player_id, track_info) in enumerate(player_frame.items()):
+                ids[frame_num, slot] = player_id
+                team = teams.get(player_id) if teams is not None else track_info.get('team')
+                slot_teams[frame_num, slot] = team or 0
+                has_ball = player_id == carriers[frame_num] if carriers is not None else track_info.get('has_ball')
+                if has_ball:
+                    carrier_slots[frame_num] = slot
+                point = track_info.get(position)
+                if point is not None:
+                    positions[frame_num, slot] = point[:2]
+
+        return cls(positions, ids, slot_teams, carrier_slots)
+
+    @property
+    def num_frames(self):
+        return len(self.positions)
+
+    def _iter_squared_distances(self):
+        # Pairwise squared distances per block of frames, inf for missing
+        # players; float32 halves the memory traffic of the (frames, slots, slots) block
+        for start in range(0, self.num_frames, CHUNK_FRAMES):
+            end = min(start + CHUNK_FRAMES, self.num_frames)
+            x = self.positions[start:end, :, 0].astype(np.float32)
+            y = self.positions[start:end, :, 1].astype(np.float32)
+            dx = x[:, :, None] - x[:, None, :]
+            dy = y[:, :, None] - y[:, None, :]
+            squared = dx * dx
+            squared += dy * dy
+            np.nan_to_num(squared, copy=False, nan=np.inf)
+            yield start, end, squared
+
+    def _opponent_mask(self, start, end):
+        teams = self.teams[start:end]
+        return (teams[:, :, None] != teams[:, None, :]) & (teams[:, :, None] > 0) & (teams[:, None, :] > 0)
+
+    def opponents_near_carrier(self, radius=PRESSURE_RADIUS):
+        """
+        Opponents within radius of the ball carrier in every frame.
+
+        Returns:
+            (frames,) int array; -1 where nobody has the ball or the carrier
+            has no position or team
+        """
+        counts = np.full(self.num_frames, -1, dtype=np.int64)
+        frames = np.flatnonzero(self.carriers >= 0)
+        slots = self.carriers[frames]
+
+        carrier_positions = self.positions[frames, slots]
+        carrier_teams = self.teams[frames, slots]
+        valid = ~np.isnan(carrier_positions[:, 0]) & (carrier_teams > 0)
+        frames, slots = frames[valid], slots[valid]
+        carrier_positions, carrier_teams = carrier_positions[valid], carrier_teams[valid]
+
+        # Only the carrier's row of the distance matrix is needed
+        offsets = self.positions[frames] - carrier_positions[:, None, :]
+        distances = np.hypot(offsets[:, :, 0], offsets[:, :, 1])
+        teams = self.teams[frames]
+        opponents = (teams != carrier_teams[:, None]) & (teams > 0)
+        counts[frames] = ((distances <= radius) & opponents).sum(axis=1)
+        return counts
+
+    def nearest_opponents(self):
+        """
+        Nearest opponent of every player in every frame.
+
+        Returns:
+            (opponent_ids, distances): (frames, slots) arrays aligned with
+            self.ids; -1 / inf where there is no positioned opponent
+        """
+        opponent_ids = np.full(self.ids.shape, -1, dtype=np.int64)
+        nearest = np.full(self.ids.shape, np.inf)
+        if self.ids.shape[1] == 0:
+            return opponent_ids, nearest
+
+        for start, end, squared in self._iter_squared_distances():
+            squared[~self._opponent_mask(start, end)] = np.inf
+            slots = squared.argmin(axis=2)
+            block_nearest = np.sqrt(np.take_along_axis(squared, slots[:, :, None], axis=2)[:, :, 0])
+            block_ids = np.take_along_axis(self.ids[start:end], slots, axis=1)
+
+            nearest[start:end] = block_nearest
+            opponent_ids[start:end] = np.where(np.isfinite(block_nearest), block_ids, -1)
+        return opponent_ids, nearest
+
+    def team_compactness(self, team):
+        """
+        Team shape per frame from the positioned players of one team.
+
+        Returns:
+            Dict of (frames,) float arrays, NaN where fewer than two players
+            are positioned: "spread" (mean distance to the team centroid),
+            "width" (extent across the pitch) and "length" (extent along it)
+        """
+        in_team = (self.teams == team) & ~np.isnan(self.positions[:, :, 0])
+        counts = in_team.sum(axis=1)
+        enough = counts >= 2
+
+        result = {"spread": np.full(self.num_frames, np.nan),
+                  "width": np.full(self.num_frames, np.nan),
+                  "length": np.full(self.num_frames, np.nan)}
+        if not enough.any():
+            return result
+
+        # Masked sums and extremes; cheaper than the nan-aware reductions
+        in_team, counts = in_team[enough], counts[enough][:, None]
+        points = self.positions[enough]
+        mask = in_team[:, :, None]
+        centroid = np.where(mask, points, 0).sum(axis=1) / counts
+        offsets = np.where(mask, points - centroid[:, None, :], 0)
+        result["spread"][enough] = np.hypot(offsets[:, :, 0], offsets[:, :, 1]).sum(axis=1) / counts[:, 0]
+        extent = np.where(mask, points, -np.inf).max(axis=1) - np.where(mask, points, np.inf).min(axis=1)
+        # Transformed x runs along the pitch, y across it (see ViewTransformer)
+        result["length"][enough] = extent[:, 0]
+        result["width"][enough] = extent[:, 1]
+        return result
+
+
+def _mean(values):
+    values = values[np.isfinite(values)]
+    return round(float(values.mean()), 2) if len(values) else None
+
+
+def proximity_summary(index, radius=PRESSURE_RADIUS):
+    """
+    Match-level pressure, marking and shape figures per team.
+
+    Args:
+        index: SpatialIndex over the match
+        radius: Pressure radius in metres
+
+    Returns:
+        Dict: {"pressure_radius_m": float, "teams": {team: {
+               "opponents_near_carrier": float, "pressured_pct": float,
+               "nearest_opponent_m": float, "spread_m": float,
+               "width_m": float, "length_m": float}},
+               "players": {player_id: {"team": int, "nearest_opponent_m": float}}}
+    """
+    pressure = index.opponents_near_carrier(radius)
+    _, nearest = index.nearest_opponents()
+
+    carrier_frames = np.flatnonzero(pressure >= 0)
+    carrier_teams = index.teams[carrier_frames, index.carriers[carrier_frames]]
+
+    teams = {}
+    for team in (1, 2):
+        team_pressure = pressure[carrier_frames[carrier_teams == team]]
+        compactness = index.team_compactness(team)
+        teams[team] = {
+            "opponents_near_carrier": _mean(team_pressure.astype(float)),
+            "pressured_pct": round(float((team_pressure > 0).mean()) * 100, 1) if len(team_pressure) else None,
+            "nearest_opponent_m": _mean(nearest[index.teams == team]),
+            "spread_m": _mean(compactness["spread"]),
+            "width_m": _mean(compactness["width"]),
+            "length_m": _mean(compactness["length"])
+        }
+
+    # Per-player means via one grouping pass instead of a mask per player
+    marked = np.isfinite(nearest) & (index.ids >= 0)
+    player_ids, inverse = np.unique(index.ids[marked], return_inverse=True)
+    frame_counts = np.bincount(inverse, minlength=len(player_ids))
+    nearest_sums = np.bincount(inverse, weights=nearest[marked], minlength=len(player_ids))
+    team_counts = np.zeros((len(player_ids), 3), dtype=np.int64)
+    np.add.at(team_counts, (inverse, np.clip(index.teams[marked], 0, 2)), 1)
+
+    players = {}
+    for i, player_id in enumerate(player_ids):
+        players[int(player_id)] = {
+            "team": int(team_counts[i].argmax()),
+            "nearest_opponent_m": round(float(nearest_sums[i] / frame_counts[i]), 2)
+        }
+
+    return {"pressure_radius_m": radius, "teams": teams, "players": players}
@@ -0,0 +1,2 @@
+from .stats_store import StatsStore
+from .kinematics import compute_player_kinematics
\ No newline at end of file
@@ -0,0 +1,62 @@
+import os
+import numpy as np
+
+# Frame-to-frame speeds above this are treated as tracking jumps, not running
+MAX_PLAYER_SPEED_KMH = float(os.getenv('MAX_PLAYER_SPEED_KMH', '40'))
+
+
+def compute_player_kinematics(tracks, fps):
+    """
+    Per-player distance and speed from transformed (court metre) positions.
+
+    Args:
+        tracks: Dictionary with 'players' tracks carrying 'position_transformed'
+        fps: Frames per second
+
+    Returns:
+        List of dicts: [{"player_id": int, "team": int, "frames": int,
+                         "ball_frames": int, "distance_m": float,
+                         "max_speed_kmh": float, "avg_speed_kmh": float}, ...]
+    """
+    per_player = {}
+    for frame_num, player_frame in enumerate(tracks.get('players', [])):
+        for player_id, track_info in player_frame.items():
+            stats = per_player.setdefault(int(player_id), {"frames": [], "positions": [], "teams": [], "ball_frames": 0})
+            stats["teams"].append(track_info.get('team', 0))
+            if track_info.get('has_ball'):
+                stats["ball_frames"] += 1
+            position = track_info.get('position_transformed')
+            if position is not None:
+                stats["frames"].append(frame_num)
+                stats["positions"].append(position)
+
+    kinematics = []
+    for player_id, stats in per_player.items():
+        distance = 0.0
+        max_speed = 0.0
+        moving_time = 0.0
+
+        if len(stats["frames"]) > 1:
+            frames = np.array(stats["frames"])
+            positions = np.array(stats["positions"], dtype=np.float64)
+            step_distance = np.linalg.norm(np.diff(positions, axis=0), axis=1)
+            step_time = np.diff(frames) / fps
+            speed_kmh = step_distance / step_time * 3.6
+
+            valid = speed_kmh <= MAX_PLAYER_SPEED_KMH
+            distance = float(step_distance[valid].sum())
+            moving_time = float(step_time[valid].sum())
+            max_speed = float(speed_kmh[valid].max()) if valid.any() else 0.0
+
+        teams = [int(team) for team in stats["teams"] if team]
+        kinematics.append({
+            "player_id": player_id,
+            "team": max(set(teams), key=teams.count) if teams else 0,
+            "frames": len(stats["teams"]),
+            "ball_frames": stats["ball_frames"],
+            "distance_m": round(distance, 2),
+            "max_speed_kmh": round(max_speed, 2),
+            "avg_speed_kmh": round(distance / moving_time * 3.6, 2) if moving_time else 0.0
+        })
+
+    return kinematics
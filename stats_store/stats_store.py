@@ -0,0 +1,204 @@
+import json
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id TEXT PRIMARY KEY,
+    ingested_at REAL NOT NULL,
+    frames INTEGER,
+    fps REAL,
+    duration_sec REAL,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS team_stats (
+    match_id TEXT NOT NULL,
+    team INTEGER NOT NULL,
+    team_name TEXT,
+    goals INTEGER NOT NULL DEFAULT 0,
+    passes INTEGER NOT NULL DEFAULT 0,
+    possession_pct REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (match_id, team)
+);
+CREATE TABLE IF NOT EXISTS player_stats (
+    match_id TEXT NOT NULL,
+    player_id INTEGER NOT NULL,
+    team INTEGER,
+    frames INTEGER NOT NULL DEFAULT 0,
+    ball_frames INTEGER NOT NULL DEFAULT 0,
+    distance_m REAL NOT NULL DEFAULT 0,
+    max_speed_kmh REAL NOT NULL DEFAULT 0,
+    avg_speed_kmh REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (match_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS idx_player_stats_player ON player_stats (player_id);
+CREATE INDEX IF NOT EXISTS idx_player_stats_team ON player_stats (team);
+CREATE TABLE IF NOT EXISTS events (
+    match_id TEXT NOT NULL,
+    frame INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    type TEXT NOT NULL,
+    team INTEGER,
+    player_id INTEGER,
+    receiver_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_events_match_time ON events (match_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_type_team ON events (type, team, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_player ON events (player_id, timestamp);
+"""
+
+MATCH_TABLES = ("events", "player_stats", "team_stats", "matches")
+
+
+class StatsStore:
+    """
+    Local SQLite store of match summaries, player kinematics and events.
+
+    Matches are ingested one at a time; re-ingesting a match_id replaces
+    only that match's rows. Player ids are the tracker ids of each match,
+    and team numbers are that match's colour clusters, so only team names
+    (from the fixture) are aggregated across matches.
+    """
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        # Stores created before team names were recorded
+        columns = [row["name"] for row in self.conn.execute("PRAGMA table_info(team_stats)")]
+        if "team_name" not in columns:
+            self.conn.execute("ALTER TABLE team_stats ADD COLUMN team_name TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_team_stats_name ON team_stats (team_name)")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def ingest_match(self, match_id, summary, player_stats=None, events=None, team_names=None):
+        """
+        Insert or replace one match.
+
+        Args:
+            match_id: Unique match identifier
+            summary: Dict as written to summary.json
+            player_stats: Optional list from compute_player_kinematics
+            events: Optional event dicts; defaults to the summary timeline
+                    events, or its goal events for older summaries
+            team_names: Optional {team: name} for this match's team numbers,
+                        e.g. from the HOME_TEAM/AWAY_TEAM fixture
+        """
+        team_names = team_names or {}
+        if events is None:
+            events = summary.get("timeline", {}).get("events") or summary.get("goals", {}).get("events", [])
+        video = summary.get("video", {})
+
+        with self.conn:
+            self._delete_rows(match_id)
+
+            self.conn.execute(
+                "INSERT INTO matches (match_id, ingested_at, frames, fps, duration_sec, summary) VALUES (?, ?, ?, ?, ?, ?)",
+                (match_id, time.time(), video.get("frames"), video.get("fps"), video.get("duration_sec"), json.dumps(summary)))
+
+            self.conn.executemany(
+                "INSERT INTO team_stats (match_id, team, team_name, goals, passes, possession_pct) VALUES (?, ?, ?, ?, ?, ?)",
+                [(match_id,
+                  team,
+                  team_names.get(team),
+                  summary.get("goals", {}).get(f"team{team}", 0),
+                  summary.get("passes", {}).get(f"team{team}", 0),
+                  summary.get("possession", {}).get(f"team{team}_pct", 0.0))
+                 for team in (1, 2)])
+
+            self.conn.executemany(
+                "INSERT INTO player_stats (match_id, player_id, team, frames, ball_frames, distance_m, max_speed_kmh, avg_speed_kmh) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(match_id, p["player_id"], p.get("team"), p.get("frames", 0), p.get("ball_frames", 0),
+                  p.get("distance_m", 0.0), p.get("max_speed_kmh", 0.0), p.get("avg_speed_kmh", 0.0))
+                 for p in player_stats or []])
+
+            self.conn.executemany(
+                "INSERT INTO events (match_id, frame, timestamp, type, team, player_id, receiver_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(match_id, e["frame"], e["timestamp"], e.get("type", "goal"), e.get("team"),
+                  e.get("player_id", e.get("passer")), e.get("receiver_id", e.get("receiver")))
+                 for e in events])
+
+    def remove_match(self, match_id):
+        with self.conn:
+            self._delete_rows(match_id)
+
+    def _delete_rows(self, match_id):
+        for table in MATCH_TABLES:
+            self.conn.execute(f"DELETE FROM {table} WHERE match_id = ?", (match_id,))
+
+    def query(self, sql, params=()):
+        """
+        Run an arbitrary read query and return rows as dicts.
+        """
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def matches(self):
+        return self.query("SELECT match_id, ingested_at, frames, fps, duration_sec FROM matches ORDER BY match_id")
+
+    def get_summary(self, match_id):
+        row = self.conn.execute("SELECT summary FROM matches WHERE match_id = ?", (match_id,)).fetchone()
+        return json.loads(row["summary"]) if row else None
+
+    def team_totals(self, team_name=None):
+        """
+        Goals, passes and average possession per named team across all
+        matches. Matches ingested without team names are left out.
+        """
+        where, params = self._where(team_name=team_name)
+        where += (" AND" if where else " WHERE") + " team_name IS NOT NULL"
+        return self.query(
+            "SELECT team_name, COUNT(*) AS matches, SUM(goals) AS goals, SUM(passes) AS passes, "
+            f"ROUND(AVG(possession_pct), 1) AS avg_possession_pct FROM team_stats{where} "
+            "GROUP BY team_name ORDER BY team_name", params)
+
+    def match_team_stats(self, match_id):
+        """
+        Goals, passes and possession per team number in one match.
+        """
+        return self.query(
+            "SELECT team, team_name, goals, passes, possession_pct FROM team_stats WHERE match_id = ? ORDER BY team",
+            (match_id,))
+
+    def player_totals(self, match_id, player_id=None, team=None):
+        """
+        Distance, speed and ball time per player in one match.
+
+        Player ids are tracker ids, which only identify a player within a
+        match, so totals are never aggregated across matches.
+        """
+        where, params = self._where(match_id=match_id, player_id=player_id, team=team)
+        return self.query(
+            "SELECT player_id, team, frames, ball_frames, ROUND(distance_m, 2) AS distance_m, max_speed_kmh, "
+            f"avg_speed_kmh FROM player_stats{where} ORDER BY player_id", params)
+
+    def event_counts(self, event_type=None, team=None, player_id=None, t1=None, t2=None):
+        """
+        Number of events per match, filtered by type, team, player and time range in seconds.
+        """
+        where, params = self._where(type=event_type, team=team, player_id=player_id)
+        if t1 is not None:
+            where += (" AND" if where else " WHERE") + " timestamp >= ?"
+            params += (t1,)
+        if t2 is not None:
+            where += (" AND" if where else " WHERE") + " timestamp < ?"
+            params += (t2,)
+        return self.query(
+            f"SELECT match_id, type, COUNT(*) AS count FROM events{where} GROUP BY match_id, type ORDER BY match_id",
+            params)
+
+    def _where(self, **filters):
+        clauses = [(column, value) for column, value in filters.items() if value is not None]
+        if not clauses:
+            return "", ()
+        return (" WHERE " + " AND ".join(f"{column} = ?" for column, _ in clauses),
+                tuple(value for _, value in clauses))
@@ -1 +1,2 @@
-from .team_assigner import TeamAssigner
\ No newline at end of file
+from .team_assigner import TeamAssigner
+from .kit_library import KitLibrary
\ No newline at end of file
@@ -0,0 +1,90 @@
+import json
+import os
+import numpy as np
+
+KIT_TYPES = ("home", "away", "goalkeeper")
+# Cap on the sample weight of a stored prototype, so kits can drift with
+# lighting and new seasons instead of freezing after many matches
+KIT_MAX_COUNT = int(os.getenv('KIT_MAX_COUNT', '50'))
+
+
+class KitLibrary:
+    """
+    Persistent kit colour prototypes per team, stored as JSON:
+
+        {"teams": {"<team>": {"home": {"color": [b, g, r], "count": n}, ...}}}
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.teams = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.teams = json.load(f).get("teams", {})
+
+    def save(self, path=None):
+        path = path or self.path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"teams": self.teams}, f, indent=2)
+
+    def get_color(self, team_name, kit):
+        entry = self.teams.get(team_name, {}).get(kit)
+        if entry is None:
+            return None
+        return np.array(entry["color"], dtype=np.float64)
+
+    def has_kit(self, team_name, kit):
+        return self.get_color(team_name, kit) is not None
+
+    def update(self, team_name, kit, colors):
+        """
+        Fold new colour samples into a team's kit prototype.
+
+        Args:
+            team_name: Club name
+            kit: One of "home", "away", "goalkeeper"
+            colors: Iterable of BGR colours from this match
+        """
+        if kit not in KIT_TYPES:
+            raise ValueError(f"Unknown kit type: {kit}")
+        colors = np.array(list(colors), dtype=np.float64).reshape(-1, 3)
+        if len(colors) == 0:
+            return
+
+        entry = self.teams.setdefault(team_name, {}).get(kit)
+        if entry is None:
+            color, count = colors.mean(axis=0), len(colors)
+        else:
+            old_count = min(entry["count"], KIT_MAX_COUNT)
+            count = old_count + len(colors)
+            color = (np.array(entry["color"]) * old_count + colors.sum(axis=0)) / count
+
+        self.teams[team_name][kit] = {"color": [round(float(c), 2) for c in color],
+                                      "count": int(min(count, KIT_MAX_COUNT))}
+
+    def get_prototypes(self, teams):
+        """
+        Prototype colours for a fixture.
+
+        Args:
+            teams: Dict of team id -> (team_name, kit), e.g. {1: ("Arsenal", "home")}
+
+        Returns:
+            (colors, team_ids, kits) arrays for nearest-prototype lookup, or
+            None if an outfield kit of either team is missing
+        """
+        colors = []
+        team_ids = []
+        kits = []
+        for team_id, (team_name, kit) in teams.items():
+            if not self.has_kit(team_name, kit):
+                return None
+            for prototype_kit in (kit, "goalkeeper"):
+                color = self.get_color(team_name, prototype_kit)
+                if color is not None:
+                    colors.append(color)
+                    team_ids.append(team_id)
+                    kits.append(prototype_kit)
+        return np.array(colors), np.array(team_ids), kits
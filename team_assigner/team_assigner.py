@@ -1,9 +1,41 @@
+import os
+import numpy as np
 from sklearn.cluster import KMeans
 
+# A player's colour this far (BGR distance) from their team's median is a goalkeeper kit
+KIT_OUTLIER_DISTANCE = float(os.getenv('KIT_OUTLIER_DISTANCE', '80'))
+# Fewest team colour samples for a meaningful median
+KIT_MIN_SAMPLES = int(os.getenv('KIT_MIN_SAMPLES', '3'))
+
 class TeamAssigner:
-    def __init__(self):
+    def __init__(self, kit_library=None, teams=None):
         self.team_colors = {}
         self.player_team_dict = {}
+        self.player_kit_dict = {}
+        self.player_colors = {}
+
+        # Known fixture: team id -> (team_name, kit), classified against stored prototypes
+        self.kit_library = kit_library
+        self.teams = teams
+        self.prototypes = None
+        if kit_library is not None and teams:
+            self.prototypes = kit_library.get_prototypes(teams)
+            if self.prototypes is not None:
+                for team_id, (team_name, kit) in teams.items():
+                    self.team_colors[team_id] = kit_library.get_color(team_name, kit)
+
+    def has_prototypes(self):
+        return self.prototypes is not None
+
+    def get_known_team_colors(self):
+        if self.kit_library is None or not self.teams:
+            return {}
+        known_colors = {}
+        for team_id, (team_name, kit) in self.teams.items():
+            color = self.kit_library.get_color(team_name, kit)
+            if color is not None:
+                known_colors[team_id] = color
+        return known_colors
     
     def get_clustering_model(self,image):
         # Reshape the image to 2D array
@@ -50,6 +82,16 @@ class TeamAssigner:
         kmeans = KMeans(n_clusters=2, init="k-means++",n_init=10)
         kmeans.fit(player_colors)
 
+        # Order clusters to match any kit already in the library, so new
+        # samples are folded into the right team's prototype
+        known_colors = self.get_known_team_colors()
+        if known_colors:
+            centers = kmeans.cluster_centers_
+            same = sum(np.linalg.norm(centers[team_id-1] - color) for team_id, color in known_colors.items())
+            swapped = sum(np.linalg.norm(centers[2-team_id] - color) for team_id, color in known_colors.items())
+            if swapped < same:
+                kmeans.cluster_centers_ = centers[::-1].copy()
+
         self.kmeans = kmeans
 
         self.team_colors[1] = kmeans.cluster_centers_[0]
@@ -60,10 +102,21 @@ class TeamAssigner:
         if player_id in self.player_team_dict:
             return self.player_team_dict[player_id]
 
-        player_color = self.get_player_color(frame,player_bbox)
-
-        team_id = self.kmeans.predict(player_color.reshape(1,-1))[0]
-        team_id+=1
+        # Colours may already have been extracted by a parallel stage
+        player_color = self.player_colors.get(player_id)
+        if player_color is None:
+            player_color = self.get_player_color(frame,player_bbox)
+            self.player_colors[player_id] = player_color
+
+        if self.prototypes is not None:
+            # Nearest kit prototype, no per-match clustering
+            colors, team_ids, kits = self.prototypes
+            nearest = int(np.linalg.norm(colors - player_color, axis=1).argmin())
+            team_id = int(team_ids[nearest])
+            self.player_kit_dict[player_id] = kits[nearest]
+        else:
+            team_id = self.kmeans.predict(player_color.reshape(1,-1))[0]
+            team_id+=1
 
         if player_id ==91:
             team_id=1
@@ -71,3 +124,66 @@ class TeamAssigner:
         self.player_team_dict[player_id] = team_id
 
         return team_id
+
+    def has_known_kit(self):
+        # At least one fixture kit is in the library, so clusters were aligned to it
+        return bool(self.get_known_team_colors())
+
+    def split_goalkeepers(self, colors):
+        """
+        Split one team's player colours into outfield and goalkeeper
+        samples: goalkeepers wear a different kit, so their colours are
+        outliers from the team's median colour.
+
+        Returns:
+            (outfield indices, goalkeeper indices)
+        """
+        if len(colors) < KIT_MIN_SAMPLES:
+            return list(range(len(colors))), []
+        colors = np.asarray(colors, dtype=np.float64)
+        distances = np.linalg.norm(colors - np.median(colors, axis=0), axis=1)
+        outliers = distances > KIT_OUTLIER_DISTANCE
+        return np.flatnonzero(~outliers).tolist(), np.flatnonzero(outliers).tolist()
+
+    def update_kit_library(self, confirm_mapping=False):
+        """
+        Fold this match's player colours into the kit library prototypes.
+
+        Clusters are only matched to team names through a kit the library
+        already knows. Without one, which cluster is the home side is a
+        guess, so nothing is stored unless confirm_mapping says the current
+        team 1 / team 2 colours are the fixture's home / away kits (or a
+        kit is seeded with KitLibrary.update).
+
+        Args:
+            confirm_mapping: The caller checked team_colors against the fixture
+
+        Returns:
+            True if the library was updated
+        """
+        if self.kit_library is None or not self.teams:
+            return False
+        if not self.has_prototypes() and not self.has_known_kit() and not confirm_mapping:
+            return False
+
+        for team_id, (team_name, kit) in self.teams.items():
+            samples = {kit: [], "goalkeeper": []}
+            unlabelled = []
+            for player_id, color in self.player_colors.items():
+                if self.player_team_dict.get(player_id) != team_id:
+                    continue
+                if player_id in self.player_kit_dict:
+                    samples[self.player_kit_dict[player_id]].append(color)
+                else:
+                    unlabelled.append(color)
+
+            # Until a goalkeeper prototype exists, goalkeepers are classified
+            # with the nearest outfield kit; separate them by colour instead
+            colors = samples[kit] + unlabelled
+            outfield, goalkeepers = self.split_goalkeepers(colors)
+            samples[kit] = [colors[i] for i in outfield]
+            samples["goalkeeper"] += [colors[i] for i in goalkeepers]
+
+            for sample_kit, colors in samples.items():
+                self.kit_library.update(team_name, sample_kit, colors)
+        return True
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from events.ball_flight import get_ball_centers, segment_ball_flight, detect_flight_passes
+from events.pass_detector import detect_pass_events
+
+FPS = 25
+
+def ball_frame(x, y):
+    return {1: {'bbox': [x - 4, y - 4, x + 4, y + 4]}}
+
+def player(x, y=300):
+    # Feet at (x, y)
+    return {'bbox': [x - 10, y - 60, x + 10, y]}
+
+def make_pass_tracks():
+    """Player 1 holds the ball, kicks it past opponent 3 to teammate 2, who holds it"""
+    ball = []
+    for _ in range(10):
+        ball.append(ball_frame(100, 300))
+    for i in range(1, 11):
+        ball.append(ball_frame(100 + 50 * i, 300))  # 1250 px/s
+    for _ in range(10):
+        ball.append(ball_frame(600, 300))
+    players = [{1: player(95), 2: player(605), 3: player(350, 310)} for _ in ball]
+    return {'players': players, 'ball': ball}
+
+class TestBallFlight(unittest.TestCase):
+
+    def test_segmentation(self):
+        """Held ball is contact, a fast straight run is one flight"""
+        centers = get_ball_centers(make_pass_tracks()['ball'])
+        segments = segment_ball_flight(centers, FPS)
+
+        self.assertEqual(len(segments["flights"]), 1)
+        start, end = segments["flights"][0]
+        self.assertTrue(8 <= start <= 10)
+        self.assertTrue(19 <= end <= 21)
+        self.assertTrue(segments["contact"][:5].all())
+        self.assertTrue(segments["contact"][-5:].all())
+
+    def test_direction_change_splits_flight(self):
+        """A sharp deflection ends one flight and starts another"""
+        xs = [100 + 40 * i for i in range(10)]
+        path = [(x, 300) for x in xs] + [(460, 300 + 40 * i) for i in range(1, 11)]
+        centers = np.array(path, dtype=float)
+        flights = segment_ball_flight(centers, FPS)["flights"]
+        self.assertEqual(len(flights), 2)
+        self.assertLessEqual(flights[0][1], flights[1][0])
+
+    def test_pass_past_opponent(self):
+        """The flight is linked to the kicker and the receiver, not the opponent it passes"""
+        tracks = make_pass_tracks()
+        team_assignments = {1: 1, 2: 1, 3: 2}
+
+        passes = detect_flight_passes(tracks, team_assignments, FPS)
+        self.assertEqual(len(passes), 1)
+        self.assertEqual((passes[0]['passer'], passes[0]['receiver'], passes[0]['team']), (1, 2, 1))
+        self.assertGreater(passes[0]['frame'], passes[0]['start_frame'])
+
+        # The same pass to an opponent is not a completed pass
+        self.assertEqual(detect_flight_passes(tracks, {1: 1, 2: 2, 3: 2}, FPS), [])
+        self.assertEqual(detect_flight_passes({}, {}, FPS), [])
+
+    def test_same_event_format(self):
+        """Flight passes carry the keys of the possession-based detector"""
+        tracks = make_pass_tracks()
+        flight = detect_flight_passes(tracks, {1: 1, 2: 1, 3: 2}, FPS)[0]
+        for pass_event in detect_pass_events(tracks, {1: 1, 2: 1, 3: 2}, FPS):
+            self.assertTrue(set(pass_event) <= set(flight))
+
+if __name__ == '__main__':
+    unittest.main()
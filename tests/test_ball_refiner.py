@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from trackers.ball_refiner import BallRefiner, predict_ball_position, get_roi, get_tiles
+
+class _Array:
+    def __init__(self, values):
+        self.values = np.array(values, dtype=np.float32)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+class _Boxes:
+    def __init__(self, xyxy, conf):
+        self.xyxy = _Array(xyxy)
+        self.conf = _Array(conf)
+
+    def __len__(self):
+        return len(self.conf.values)
+
+class _Result:
+    def __init__(self, xyxy, conf):
+        self.boxes = _Boxes(xyxy, conf)
+
+class FakeBallModel:
+    """Finds white pixels in each crop and reports them as a ball"""
+    names = {0: 'ball', 1: 'player'}
+
+    def __init__(self):
+        self.crop_shapes = []
+
+    def predict(self, crops, **kwargs):
+        results = []
+        for crop in crops:
+            self.crop_shapes.append(crop.shape[:2])
+            ys, xs = np.nonzero(crop[:, :, 0] == 255)
+            if len(xs) == 0:
+                results.append(_Result(np.zeros((0, 4)), []))
+            else:
+                results.append(_Result([[xs.min(), ys.min(), xs.max(), ys.max()]], [0.9]))
+        return results
+
+def make_frame(ball_x=None, ball_y=None):
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    if ball_x is not None:
+        frame[ball_y - 3:ball_y + 3, ball_x - 3:ball_x + 3] = 255
+    return frame
+
+class TestBallRefiner(unittest.TestCase):
+
+    def test_prediction_and_boxes(self):
+        """Constant velocity prediction, clipped ROI and full tile coverage"""
+        ball_tracks = [{1: {'bbox': [x - 3, 97, x + 3, 103]}} for x in (100, 110, 120)] + [{}]
+        x, y = predict_ball_position(ball_tracks, 3)
+        self.assertAlmostEqual(x, 130.0)
+        self.assertAlmostEqual(y, 100.0)
+        self.assertIsNone(predict_ball_position([{1: {'bbox': [0, 0, 2, 2]}}] + [{}] * 30, 31))
+
+        self.assertEqual(get_roi((10, 700), (720, 1280), 320), (0, 400, 320, 720))
+        tiles = get_tiles((720, 1280), 640, 0.2)
+        self.assertEqual(max(t[2] for t in tiles), 1280)
+        self.assertEqual(max(t[3] for t in tiles), 720)
+
+    def test_refine_fills_missed_frames(self):
+        """Missed frames are recovered from ROI crops in full-frame coordinates"""
+        positions = [(300 + 10 * i, 400) for i in range(6)]
+        frames = [make_frame(x, y) for x, y in positions]
+        ball_tracks = [{1: {'bbox': [x - 3, y - 3, x + 2, y + 2]}} for x, y in positions[:3]] + [{}, {}, {}]
+
+        model = FakeBallModel()
+        refiner = BallRefiner(model, roi_size=160)
+        refiner.refine(frames, ball_tracks)
+
+        self.assertEqual(refiner.stats['recovered_roi'], 3)
+        self.assertEqual(model.crop_shapes, [(160, 160)] * 3)
+        self.assertEqual(ball_tracks[5][1]['bbox'], [347.0, 397.0, 352.0, 402.0])
+
+    def test_refine_tiles_when_lost(self):
+        """Without a recent track the pass falls back to tiling"""
+        frames = [make_frame()] * 2 + [make_frame(1000, 600)]
+        ball_tracks = [{}, {}, {}]
+
+        refiner = BallRefiner(FakeBallModel())
+        refiner.refine(frames, ball_tracks)
+
+        self.assertEqual(refiner.stats['roi_frames'], 0)
+        self.assertEqual(refiner.stats['recovered_tiles'], 1)
+        self.assertEqual(ball_tracks[2][1]['bbox'], [997.0, 597.0, 1002.0, 602.0])
+
+    def test_refine_does_not_predict_across_cuts(self):
+        """After a cut the previous shot's ball path is not used to place the ROI"""
+        # The ball moves right in shot A; shot B starts at frame 3 with the ball elsewhere
+        positions = [(300 + 10 * i, 400) for i in range(3)]
+        frames = [make_frame(x, y) for x, y in positions] + [make_frame(1000, 600)]
+        ball_tracks = [{1: {'bbox': [x - 3, y - 3, x + 2, y + 2]}} for x, y in positions] + [{}]
+
+        self.assertIsNone(predict_ball_position(ball_tracks, 3, shot_start=3))
+
+        refiner = BallRefiner(FakeBallModel(), roi_size=160)
+        refiner.refine(frames, ball_tracks, cuts=[3])
+
+        self.assertEqual(refiner.stats['roi_frames'], 0)
+        self.assertEqual(ball_tracks[3], {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from trackers.detector_backend import OnnxDetector, get_detector, letterbox, decode_predictions, CALIBRATION_FRAMES
+
+def head_output(boxes, num_classes=3, anchors=10):
+    """Raw YOLO head output (4 + num_classes, anchors) from (cx, cy, w, h, class, score) rows"""
+    output = np.zeros((4 + num_classes, anchors), dtype=np.float32)
+    for anchor, (cx, cy, w, h, class_id, score) in enumerate(boxes):
+        output[:4, anchor] = (cx, cy, w, h)
+        output[4 + class_id, anchor] = score
+    return output
+
+class FakeSession:
+    """Returns one player box centred in the letterboxed input"""
+    def __init__(self):
+        self.input_shapes = []
+
+    def run(self, output_names, feeds):
+        batch = feeds['images']
+        self.input_shapes.append(batch.shape)
+        height, width = batch.shape[2:]
+        output = head_output([(width / 2, height / 2, 64, 128, 0, 0.9)])
+        return [np.stack([output] * len(batch))]
+
+class TestDetectorBackend(unittest.TestCase):
+
+    def test_letterbox(self):
+        """Rectangular letterbox to the next stride multiple, as ultralytics"""
+        image, gain, (left, top) = letterbox(np.zeros((1080, 1920, 3), dtype=np.uint8), 640)
+        self.assertEqual(image.shape, (384, 640, 3))
+        self.assertAlmostEqual(gain, 1 / 3)
+        self.assertEqual((left, top), (0, 12))
+        self.assertTrue((image[0] == 114).all())
+
+    def test_decode_predictions(self):
+        """Confidence filter, per-class NMS and class selection"""
+        output = head_output([
+            (100, 100, 40, 80, 0, 0.9),
+            (102, 101, 40, 80, 0, 0.8),   # duplicate of the first
+            (102, 101, 40, 80, 1, 0.7),   # same place, other class
+            (300, 200, 10, 10, 2, 0.05),  # below conf
+        ])
+
+        boxes = decode_predictions(output, conf=0.1)
+        self.assertEqual(boxes[:, 5].tolist(), [0, 1])
+        np.testing.assert_allclose(boxes[0, :5], [80, 60, 120, 140, 0.9], rtol=1e-5)
+
+        boxes = decode_predictions(output, conf=0.1, classes=[1])
+        self.assertEqual(boxes[:, 5].tolist(), [1])
+        self.assertEqual(decode_predictions(output, conf=0.95).shape, (0, 6))
+
+    def test_predict_maps_boxes_to_frame(self):
+        """Boxes come back as ultralytics Results in original frame coordinates"""
+        detector = OnnxDetector.__new__(OnnxDetector)
+        detector.imgsz = 640
+        detector.int8 = False
+        detector.session = FakeSession()
+        detector.input_name = 'images'
+        detector.names = {0: 'player', 1: 'referee', 2: 'ball'}
+
+        frames = [np.zeros((1080, 1920, 3), dtype=np.uint8)] * 3 + [np.zeros((320, 320, 3), dtype=np.uint8)]
+        results = detector.predict(frames, conf=0.1)
+
+        # Frames of one size share a batch
+        self.assertEqual(sorted(shape[0] for shape in detector.session.input_shapes), [1, 3])
+        self.assertEqual(results[0].names[0], 'player')
+        np.testing.assert_allclose(results[0].boxes.xyxy.numpy()[0], [864, 348, 1056, 732], atol=1e-3)
+        np.testing.assert_allclose(results[3].boxes.xyxy.numpy()[0], [144, 128, 176, 192], atol=1e-3)
+
+    def test_int8_requires_explicit_calibration(self):
+        """No silent calibration on predict input, and no calibration on too few frames"""
+        detector = OnnxDetector.__new__(OnnxDetector)
+        detector.onnx_path = 'model.onnx'
+        detector.int8 = True
+        detector.calibrated = False
+
+        frames = [np.zeros((1080, 1920, 3), dtype=np.uint8)] * (CALIBRATION_FRAMES - 1)
+        with self.assertRaises(RuntimeError):
+            detector.predict(frames)
+        with self.assertRaises(ValueError):
+            detector.quantize(frames, source='synthetic')
+
+    def test_torch_backend_rejects_int8(self):
+        """INT8 is an onnx-only option and is not silently dropped"""
+        with self.assertRaises(ValueError):
+            get_detector('model.pt', 'torch', int8=True)
+
+if __name__ == '__main__':
+    unittest.main()
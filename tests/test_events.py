@@ -4,7 +4,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from events.goal_detector import detect_goals
-from events.pass_detector import detect_passes
+from events.pass_detector import detect_passes, count_passes
 from events.possession import calculate_possession
 
 class TestEventDetection(unittest.TestCase):
@@ -87,6 +87,12 @@ class TestEventDetection(unittest.TestCase):
         total = possession['team1_pct'] + possession['team2_pct'] + possession['unknown_pct']
         self.assertAlmostEqual(total, 100.0, delta=0.1)
     
+    def test_count_passes(self):
+        """Pass events from any detector are counted per team"""
+        pass_events = [{"frame": 10, "team": 1}, {"frame": 30, "team": 2}, {"frame": 50, "team": 1, "type": "flight"}]
+        self.assertEqual(count_passes(pass_events), {"team1": 2, "team2": 1})
+        self.assertEqual(count_passes([]), {"team1": 0, "team2": 0})
+    
     def test_empty_data_handling(self):
         """Test that empty data is handled gracefully"""
         # Test with empty data
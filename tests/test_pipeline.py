@@ -0,0 +1,280 @@
+import unittest
+import sys
+import os
+import pickle
+import tempfile
+from unittest import mock
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pipeline import Pipeline, FootballPipeline
+from trackers import Tracker
+from team_assigner import TeamAssigner
+from player_ball_assigner import PlayerBallAssigner
+from camera_movement_estimator import CameraMovementEstimator
+from view_transformer import ViewTransformer
+from events.goal_detector import detect_goals
+from events.pass_detector import detect_passes
+from events.possession import calculate_possession
+
+class FixedTeams:
+    """TeamAssigner stand-in with every player already classified"""
+    def __init__(self, player_team_dict):
+        self.player_team_dict = player_team_dict
+
+def ball_frame(x, y=300):
+    return {1: {'bbox': [x - 4, y - 4, x + 4, y + 4]}}
+
+def player(x, y=300):
+    return {'bbox': [x - 10, y - 60, x + 10, y]}
+
+RED = (0, 0, 220)
+WHITE = (230, 230, 230)
+
+def make_stub_match(num_frames=48, home=RED, away=WHITE):
+    """
+    Four players (1 and 2 in home shirts, 3 and 4 in away shirts) and a
+    referee on grass, with the ball passed 1 -> 2 and then lost to 3; a
+    few ball detections are missing.
+    """
+    feet = {1: (100, 200), 2: (300, 200), 3: (450, 250), 4: (550, 150)}
+    shirts = {1: home, 2: home, 3: away, 4: away}
+    ball_path = ([feet[1]] * 12 + [(100 + 40 * i, 200) for i in range(1, 6)] + [feet[2]] * 13
+                 + [(300 + 30 * i, 200 + 10 * i) for i in range(1, 5)] + [feet[3]] * 14)
+
+    frames = []
+    tracks = {"players": [], "referees": [], "ball": []}
+    for frame_num in range(num_frames):
+        frame = np.full((360, 640, 3), (40, 140, 40), dtype=np.uint8)
+        players = {}
+        for player_id, (x, y) in feet.items():
+            frame[y - 65:y - 40, x - 8:x + 8] = shirts[player_id]
+            players[player_id] = {'bbox': [x - 15, y - 70, x + 15, y]}
+        frames.append(frame)
+        tracks["players"].append(players)
+        tracks["referees"].append({9: {'bbox': [600, 230, 630, 300]}})
+        x, y = ball_path[frame_num]
+        tracks["ball"].append({} if frame_num in (5, 20, 21) else {1: {'bbox': [x - 4, y - 8, x + 4, y]}})
+    return frames, tracks
+
+def plain(value):
+    """Nested tracks with numpy arrays (team colours, court positions) as comparable lists"""
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [plain(item) for item in value]
+    return value
+
+def sequential_flow(frames, fps, tracks):
+    """The analysis as main.py ran it before the stage graph: one tracks dict annotated in place"""
+    tracker = Tracker.__new__(Tracker)
+    tracker.add_position_to_tracks(tracks)
+    CameraMovementEstimator(frames[0]).add_adjust_positions_to_tracks(tracks, [[0, 0]] * len(frames))
+    ViewTransformer().add_transformed_position_to_tracks(tracks)
+    tracks["ball"] = tracker.interpolate_ball_positions(tracks["ball"])
+
+    team_assigner = TeamAssigner()
+    best_frame = max(range(len(frames)), key=lambda i: len(tracks['players'][i]))
+    team_assigner.assign_team_color(frames[best_frame], tracks['players'][best_frame])
+    for frame_num, player_track in enumerate(tracks['players']):
+        for player_id, track in player_track.items():
+            team = team_assigner.get_player_team(frames[frame_num], track['bbox'], player_id)
+            track['team'] = team
+            track['team_color'] = team_assigner.team_colors[team]
+
+    player_assigner = PlayerBallAssigner()
+    team_ball_control = []
+    for frame_num, player_track in enumerate(tracks['players']):
+        assigned_player = -1
+        if tracks['ball'][frame_num] and 1 in tracks['ball'][frame_num]:
+            assigned_player = player_assigner.assign_ball_to_player(player_track, tracks['ball'][frame_num][1]['bbox'])
+        if assigned_player != -1:
+            player_track[assigned_player]['has_ball'] = True
+            team_ball_control.append(player_track[assigned_player]['team'])
+        else:
+            team_ball_control.append(team_ball_control[-1] if team_ball_control else 0)
+
+    team_assignments = {player_id: track['team'] for player_track in tracks['players']
+                        for player_id, track in player_track.items()}
+    goals = detect_goals(tracks["ball"], team_ball_control, frames[0].shape, fps)
+    summary = {
+        "goals": {"team1": len([g for g in goals if g["team"] == 1]),
+                  "team2": len([g for g in goals if g["team"] == 2]),
+                  "events": goals},
+        "passes": detect_passes(tracks, team_assignments, fps),
+        "possession": calculate_possession(tracks, tracks["ball"], team_assignments)
+    }
+    return summary, tracks
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.pipeline = Pipeline()
+
+        def stage(name, func):
+            def wrapped(*args):
+                self.calls.append(name)
+                return func(*args)
+            return wrapped
+
+        self.pipeline.add_stage("double", stage("double", lambda x: x * 2), ["x"], ["doubled"])
+        self.pipeline.add_stage("square", stage("square", lambda x: x * x), ["x"], ["squared"])
+        self.pipeline.add_stage("sum", stage("sum", lambda a, b: a + b), ["doubled", "squared"], ["total"])
+        self.pipeline.add_stage("split", stage("split", lambda t: (t // 2, t % 2)), ["total"], ["half", "parity"])
+
+    def test_runs_only_required_stages(self):
+        """Requesting one output runs only its dependencies"""
+        self.assertEqual(self.pipeline.run(["doubled"], x=3), {"doubled": 6})
+        self.assertEqual(self.calls, ["double"])
+
+    def test_memoizes_within_run(self):
+        """Stages run once per run even when requested again"""
+        run = self.pipeline.start(x=3)
+        self.assertEqual(run.get("half", "parity"), {"half": 7, "parity": 1})
+        self.assertEqual(run.get("total"), 15)
+        self.assertEqual(sorted(self.calls), ["double", "split", "square", "sum"])
+        self.assertEqual(len(run.executed), 4)
+
+    def test_errors(self):
+        """Unknown outputs, duplicate producers and cycles are rejected"""
+        with self.assertRaises(ValueError):
+            self.pipeline.run(["missing"], x=1)
+        with self.assertRaises(ValueError):
+            self.pipeline.add_stage("other", lambda x: x, ["x"], ["doubled"])
+        self.pipeline.add_stage("a", lambda b: b, ["b"], ["a"])
+        self.pipeline.add_stage("b", lambda a: a, ["a"], ["b"])
+        with self.assertRaises(ValueError):
+            self.pipeline.plan(["a"])
+
+    def test_football_plan_is_pruned(self):
+        """Possession does not touch positions, camera movement or referees"""
+        pipeline = FootballPipeline(tracker=None)
+        stages = [stage.name for stage in pipeline.plan(["possession"], available={"video_path"})]
+        self.assertIn("team_assignments", stages)
+        self.assertNotIn("player_teams", stages)
+        self.assertNotIn("camera_movement", stages)
+        self.assertFalse([name for name in stages if name.startswith("position")])
+
+        stages = [stage.name for stage in pipeline.plan(["positions_transformed.players"], available={"video_path"})]
+        self.assertIn("camera_movement", stages)
+        self.assertFalse([name for name in stages if "referees" in name or "ball" in name])
+
+    def test_decoded_representations_feed_their_stages(self):
+        """Detection and scene detection read detector-sized frames, camera movement reads grey frames"""
+        pipeline = FootballPipeline(tracker=None)
+        self.assertEqual(list(pipeline.stages["decode"].outputs), ["frames", "inference_frames", "gray_frames"])
+        self.assertIn("inference_frames", pipeline.stages["track"].inputs)
+        self.assertIn("inference_frames", pipeline.stages["scenes"].inputs)
+        self.assertNotIn("frames", pipeline.stages["scenes"].inputs)
+        self.assertIn("gray_frames", pipeline.stages["camera_movement"].inputs)
+
+    def test_flight_pass_receiver_is_team_assigned(self):
+        """Players linked as pass receivers beyond possession range still get a team"""
+        # Player 1 kicks the ball to teammate 2, who stops 50 px from where it rests
+        ball = [ball_frame(100)] * 10 + [ball_frame(100 + 50 * i) for i in range(1, 11)] + [ball_frame(600)] * 10
+        tracks = {'players': [{1: player(95), 2: player(650), 3: player(350, 310)} for _ in ball]}
+        pipeline = FootballPipeline(tracker=None)
+
+        team_assignments = pipeline.get_team_assignments(tracks, ball, FixedTeams({1: 1, 2: 1, 3: 2}), frames=None)
+        self.assertEqual(team_assignments, {1: 1, 2: 1, 3: 2})
+
+        passes = pipeline.detect_passes(tracks, ball, team_assignments, fps=25)
+        self.assertEqual([(p["passer"], p["receiver"]) for p in passes], [(1, 2)])
+
+    def test_interpolate_ball_per_shot(self):
+        """Ball gaps are filled within a live shot only, never across a cut"""
+        ball = [ball_frame(100), ball_frame(120), {}, {}, ball_frame(500, 200), {}, {}, {}, {}, ball_frame(300)]
+        scenes = {"cuts": [4, 6, 8],
+                  "shots": [{"start": 0, "end": 4, "label": "live"}, {"start": 4, "end": 6, "label": "live"},
+                            {"start": 6, "end": 8, "label": "closeup"}, {"start": 8, "end": 10, "label": "live"}],
+                  "live": [True] * 6 + [False] * 2 + [True] * 2}
+        pipeline = FootballPipeline(tracker=Tracker.__new__(Tracker))
+
+        ball = pipeline.interpolate_ball({"ball": ball}, scenes)
+
+        centers = [None if not frame else (frame[1]['bbox'][0] + 4, frame[1]['bbox'][1] + 4) for frame in ball]
+        self.assertEqual(centers, [(100, 300), (120, 300), (120, 300), (120, 300),
+                                   (500, 200), (500, 200), None, None, (300, 300), (300, 300)])
+
+class TestFootballPipelineStub(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.frames, cls.tracks = make_stub_match()
+        cls.stub_path = os.path.join(cls.tmp_dir.name, 'track_stubs.pkl')
+        with open(cls.stub_path, 'wb') as f:
+            pickle.dump(cls.tracks, f)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def make_pipeline(self):
+        return FootballPipeline(Tracker.__new__(Tracker),
+                                track_stub_path=self.stub_path,
+                                estimate_camera_movement=False,
+                                detect_scenes=False)
+
+    def start(self, pipeline=None, frames=None):
+        # Team colour clustering draws from numpy's global generator
+        np.random.seed(0)
+        pipeline = pipeline or self.make_pipeline()
+        frames = frames or self.frames
+        return pipeline.start(frames=frames, inference_frames=frames, gray_frames=None, fps=24.0)
+
+    @mock.patch('pipeline.football_pipeline.PASS_DETECTOR', 'possession')
+    def test_summary_matches_sequential_flow(self):
+        """Same events and annotated tracks as the in-place main.py flow"""
+        np.random.seed(0)
+        with open(self.stub_path, 'rb') as f:
+            expected_summary, expected_tracks = sequential_flow(self.frames, 24.0, pickle.load(f))
+
+        run = self.start()
+        summary = run.get("summary")
+        tracks = run.get("annotated_tracks")
+
+        self.assertGreater(sum(expected_summary["passes"].values()), 0)
+        self.assertEqual(summary["goals"], expected_summary["goals"])
+        self.assertEqual(summary["passes"], expected_summary["passes"])
+        self.assertEqual(summary["possession"], expected_summary["possession"])
+        self.assertEqual(summary["video"], {"frames": 48, "fps": 24.0, "duration_sec": 2.0})
+        self.assertEqual(plain(tracks["players"]), plain(expected_tracks["players"]))
+        self.assertEqual(plain(tracks["referees"]), plain(expected_tracks["referees"]))
+        self.assertEqual([frame[1]['bbox'] for frame in tracks["ball"]],
+                         [frame[1]['bbox'] for frame in expected_tracks["ball"]])
+
+    def test_outputs_do_not_depend_on_request_order(self):
+        """No stage writes into another stage's output"""
+        summary_first = self.start()
+        summary = summary_first.get("summary")
+        annotated = plain(summary_first.get("annotated_tracks"))
+
+        tracks_first = self.start()
+        self.assertEqual(tracks_first.get("tracks"), self.tracks)
+        self.assertEqual(plain(tracks_first.get("annotated_tracks")), annotated)
+        self.assertEqual(tracks_first.get("summary"), summary)
+        # The tracker's output is left as it was loaded
+        self.assertEqual(tracks_first.get("tracks"), self.tracks)
+        self.assertEqual(summary_first.get("tracks"), self.tracks)
+
+    def test_runs_do_not_share_team_state(self):
+        """A second run on the same pipeline fits its own team colours"""
+        pipeline = self.make_pipeline()
+        first = self.start(pipeline).get("annotated_tracks")
+        swapped_frames, _ = make_stub_match(home=WHITE, away=RED)
+        second_run = self.start(pipeline, swapped_frames)
+        second = second_run.get("annotated_tracks")
+
+        self.assertIsNot(second_run.get("team_assigner"), self.start(pipeline).get("team_assigner"))
+        for tracks, home_color in ((first, RED), (second, WHITE)):
+            players = tracks["players"][0]
+            self.assertEqual(players[1]['team'], players[2]['team'])
+            self.assertNotEqual(players[1]['team'], players[3]['team'])
+            # Each player's team colour is its own shirt in this run
+            np.testing.assert_allclose(players[1]['team_color'], home_color, atol=5)
+            np.testing.assert_allclose(players[3]['team_color'], RED if home_color == WHITE else WHITE, atol=5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from scene_detector import SceneDetector
+from camera_movement_estimator import CameraMovementEstimator
+
+def pitch_frame(shade=0, offset=0):
+    """Wide shot: striped green pitch under grey stands"""
+    frame = np.zeros((216, 384, 3), dtype=np.uint8)
+    frame[:] = (40, 140 + shade, 50)
+    frame[:40] = (90, 90, 90)
+    for x in range(offset % 48, 384, 48):
+        frame[40:, x:x+24, 1] = 150 + shade
+    return frame
+
+def closeup_frame():
+    frame = np.zeros((216, 384, 3), dtype=np.uint8)
+    frame[:] = (60, 90, 170)
+    frame[60:160, 120:260] = (30, 30, 200)
+    return frame
+
+def wipe_frames(before, after, num_frames=6):
+    """Graphic wipe: a blue bar sweeps across, revealing the next shot behind it"""
+    frames = []
+    for i in range(1, num_frames + 1):
+        frame = before.copy()
+        width = int(384 * i / (num_frames + 1))
+        frame[:, :width] = (200, 60, 20)
+        if i > num_frames // 2:
+            revealed = width - int(384 * (i - num_frames // 2) / (num_frames + 1))
+            frame[:, :revealed] = after[:, :revealed]
+        frames.append(frame)
+    return frames
+
+class TestSceneDetector(unittest.TestCase):
+    def test_hard_cuts_and_closeup(self):
+        frames = [pitch_frame()] * 30 + [closeup_frame()] * 20 + [pitch_frame()] * 20
+
+        scenes = SceneDetector(fps=24).detect_scenes(frames)
+
+        self.assertEqual(scenes["cuts"], [30, 50])
+        self.assertEqual([shot["label"] for shot in scenes["shots"]], ["live", "closeup", "live"])
+        self.assertEqual(sum(scenes["live"]), 50)
+        self.assertFalse(any(scenes["live"][30:50]))
+
+    def test_replay_between_wipes(self):
+        live, replay = pitch_frame(), pitch_frame(shade=30)
+        frames = [live] * 20 + wipe_frames(live, replay) + [replay] * 40 + wipe_frames(replay, live) + [live] * 20
+
+        scenes = SceneDetector(fps=24).detect_scenes(frames)
+
+        labels = [shot["label"] for shot in scenes["shots"]]
+        self.assertEqual(labels, ["live", "transition", "replay", "transition", "live"])
+        self.assertEqual(scenes["shots"][2], {"start": 26, "end": 66, "label": "replay"})
+        self.assertEqual(sum(scenes["live"]), 40)
+
+    def test_camera_pan_is_not_a_cut(self):
+        frames = [pitch_frame(offset=2 * i) for i in range(60)]
+
+        scenes = SceneDetector(fps=24).detect_scenes(frames)
+
+        self.assertEqual(scenes["cuts"], [])
+        self.assertTrue(all(scenes["live"]))
+
+    def test_empty_video(self):
+        self.assertEqual(SceneDetector().detect_scenes([]), {"cuts": [], "shots": [], "live": []})
+
+    def test_camera_movement_resets_at_cuts(self):
+        rng = np.random.default_rng(0)
+        texture = rng.integers(0, 255, (240, 1400, 3), dtype=np.uint8)
+        # Pan 5 px per frame, then cut to an unrelated view panning the other way
+        frames = [np.ascontiguousarray(texture[:, 5 * i:5 * i + 640]) for i in range(5)]
+        frames += [np.ascontiguousarray(texture[:, 740 - 5 * i:1380 - 5 * i]) for i in range(3)]
+
+        estimator = CameraMovementEstimator(frames[0])
+        camera_movement = estimator.get_camera_movement(frames, cuts=[5])
+
+        self.assertEqual(camera_movement[5], [0, 0])
+        self.assertAlmostEqual(camera_movement[6][0], -5, delta=1)
+
+if __name__ == '__main__':
+    unittest.main()
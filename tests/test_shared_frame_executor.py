@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+import pickle
+import tempfile
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pipeline import shared_frame_executor
+from pipeline.shared_frame_executor import SharedFrameExecutor
+from utils import read_video
+
+NUM_FRAMES = 12
+
+def player(x, y=100):
+    return {'bbox': [x, y, x + 40, y + 80]}
+
+class TestSharedFrameExecutor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from ultralytics import YOLO
+
+        # Fork keeps the test fast; the workers only need what is already imported
+        cls.start_method = shared_frame_executor.EXECUTOR_START_METHOD
+        shared_frame_executor.EXECUTOR_START_METHOD = 'fork'
+
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.video_path = os.path.join(cls.tmp_dir.name, 'synthetic.avi')
+        out = cv2.VideoWriter(cls.video_path, cv2.VideoWriter_fourcc(*'MJPG'), 24, (320, 240))
+        for i in range(NUM_FRAMES):
+            frame = np.full((240, 320, 3), (40, 140, 40), dtype=np.uint8)
+            # Two players in different shirts, moving right
+            frame[100:180, 20 + i:60 + i] = (0, 0, 220)
+            frame[100:180, 200 + i:240 + i] = (220, 220, 220)
+            out.write(frame)
+        out.release()
+
+        # The tracks come from a stub, but the worker still builds its Tracker
+        cls.model_path = os.path.join(cls.tmp_dir.name, 'model.pt')
+        YOLO('yolov8n.yaml').save(cls.model_path)
+
+        cls.tracks = {"players": [{1: player(20 + i), 2: player(200 + i)} for i in range(NUM_FRAMES)],
+                      "referees": [{} for _ in range(NUM_FRAMES)],
+                      "ball": [{} for _ in range(NUM_FRAMES)]}
+        cls.track_stub_path = os.path.join(cls.tmp_dir.name, 'track_stubs.pkl')
+        with open(cls.track_stub_path, 'wb') as f:
+            pickle.dump(cls.tracks, f)
+
+        cls.camera_movement = [[float(i), 0.0] for i in range(NUM_FRAMES)]
+        cls.camera_movement_stub_path = os.path.join(cls.tmp_dir.name, 'camera_movement_stub.pkl')
+        with open(cls.camera_movement_stub_path, 'wb') as f:
+            pickle.dump(cls.camera_movement, f)
+
+    @classmethod
+    def tearDownClass(cls):
+        shared_frame_executor.EXECUTOR_START_METHOD = cls.start_method
+        cls.tmp_dir.cleanup()
+
+    def make_executor(self, **kwargs):
+        options = dict(track_stub_path=self.track_stub_path,
+                       camera_movement_stub_path=self.camera_movement_stub_path,
+                       detect_scenes=False)
+        options.update(kwargs)
+        return SharedFrameExecutor(self.video_path, self.model_path, **options)
+
+    def test_run_returns_every_stage(self):
+        """Shared frames match read_video and each stage's result comes back"""
+        with self.make_executor() as executor:
+            results = executor.run()
+
+            self.assertEqual(len(results["frames"]), NUM_FRAMES)
+            for shared_frame, frame in zip(results["frames"], read_video(self.video_path)):
+                np.testing.assert_array_equal(shared_frame, frame)
+            self.assertIsNone(results["scenes"])
+            self.assertEqual(results["tracks"], self.tracks)
+            self.assertEqual(results["camera_movement"], self.camera_movement)
+            self.assertEqual(set(results["player_colors"]), {1, 2})
+            self.assertTrue({"decode", "tracks", "camera_movement", "player_colors"} <= set(executor.timings))
+
+    def test_skips_camera_movement(self):
+        """Without estimate_camera_movement no camera process runs and movement is zero"""
+        with self.make_executor(estimate_camera_movement=False) as executor:
+            results = executor.run()
+
+        self.assertEqual(results["camera_movement"], [[0, 0]] * NUM_FRAMES)
+        self.assertNotIn("camera_movement", executor.timings)
+        self.assertEqual(results["tracks"], self.tracks)
+
+    def test_failing_stage_raises(self):
+        """A worker that dies is reported in the parent instead of hanging"""
+        bad_stub_path = os.path.join(self.tmp_dir.name, 'corrupt_camera_stub.pkl')
+        with open(bad_stub_path, 'wb') as f:
+            f.write(b'not a pickle')
+
+        with self.make_executor(camera_movement_stub_path=bad_stub_path) as executor:
+            with self.assertRaises(RuntimeError):
+                executor.run()
+
+    def test_detector_options_reach_worker(self):
+        """The detection process builds its Tracker with the given detector options"""
+        with self.make_executor(detector_options={'backend': 'missing'}) as executor:
+            with self.assertRaises(RuntimeError):
+                executor.run()
+
+    def test_close_unlinks_shared_memory(self):
+        executor = self.make_executor(estimate_camera_movement=False)
+        executor.run()
+        name = executor.shm.name
+
+        executor.close()
+
+        self.assertIsNone(executor.shm)
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from spatial_index import SpatialIndex, proximity_summary
+from utils import measure_distance
+
+def player(x, y, team, has_ball=False):
+    track = {'position_transformed': [x, y], 'team': team}
+    if has_ball:
+        track['has_ball'] = True
+    return track
+
+def random_tracks(num_frames=50, seed=0):
+    rng = np.random.default_rng(seed)
+    tracks = []
+    for _ in range(num_frames):
+        frame = {}
+        for player_id in rng.choice(30, size=rng.integers(0, 25), replace=False):
+            position = rng.uniform([0, 0], [23, 68]).tolist() if rng.random() > 0.1 else None
+            frame[int(player_id)] = {'position_transformed': position, 'team': int(rng.integers(0, 3))}
+        if frame and rng.random() > 0.3:
+            frame[next(iter(frame))]['has_ball'] = True
+        tracks.append(frame)
+    return tracks
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def test_opponents_near_carrier(self):
+        tracks = [
+            {1: player(10, 10, 1, has_ball=True), 2: player(12, 10, 2), 3: player(10, 14, 2),
+             4: player(20, 10, 2), 5: player(11, 10, 1)},
+            {1: player(10, 10, 1), 2: player(12, 10, 2)},
+            {1: {'position_transformed': None, 'team': 1, 'has_ball': True}, 2: player(12, 10, 2)},
+        ]
+        index = SpatialIndex.from_tracks(tracks)
+
+        counts = index.opponents_near_carrier(radius=5)
+
+        # Teammate 5 and distant opponent 4 do not count; no carrier / unpositioned carrier -> -1
+        self.assertEqual(counts.tolist(), [2, -1, -1])
+
+    def test_explicit_teams_and_carriers(self):
+        """Teams and carriers passed in override whatever the tracks carry"""
+        tracks = [
+            {1: {'position_transformed': [10, 10]}, 2: {'position_transformed': [12, 10]},
+             3: {'position_transformed': [10, 12], 'team': 1, 'has_ball': True}},
+            {1: {'position_transformed': [10, 10]}, 2: {'position_transformed': [12, 10]}},
+        ]
+        index = SpatialIndex.from_tracks(tracks, teams={1: 1, 2: 2, 3: 2}, carriers=[1, -1])
+
+        self.assertEqual(index.teams.tolist(), [[1, 2, 2], [1, 2, 0]])
+        # Player 1 carries in frame 0 and is pressed by 2 and 3
+        self.assertEqual(index.opponents_near_carrier(radius=5).tolist(), [2, -1])
+
+    def test_nearest_opponents(self):
+        tracks = [{1: player(0, 0, 1), 2: player(3, 4, 2), 3: player(0, 1, 1), 4: player(30, 0, 2), 5: player(0, 2, 0)}]
+        index = SpatialIndex.from_tracks(tracks)
+
+        opponent_ids, distances = index.nearest_opponents()
+
+        by_player = dict(zip(index.ids[0].tolist(), zip(opponent_ids[0].tolist(), distances[0].tolist())))
+        self.assertEqual(by_player[1][0], 2)
+        self.assertAlmostEqual(by_player[1][1], 5.0, places=4)
+        self.assertEqual(by_player[2][0], 3)
+        self.assertEqual(by_player[4][0], 1)
+        # No team, no opponents
+        self.assertEqual(by_player[5], (-1, float('inf')))
+
+    def test_matches_pairwise_loop(self):
+        tracks = random_tracks()
+        index = SpatialIndex.from_tracks(tracks)
+        opponent_ids, distances = index.nearest_opponents()
+        counts = index.opponents_near_carrier(radius=10)
+
+        for frame_num, frame in enumerate(tracks):
+            for slot, (player_id, track) in enumerate(frame.items()):
+                best = np.inf
+                for other_id, other in frame.items():
+                    if (other['team'] and track['team'] and other['team'] != track['team']
+                            and track['position_transformed'] and other['position_transformed']):
+                        best = min(best, measure_distance(track['position_transformed'], other['position_transformed']))
+                self.assertAlmostEqual(distances[frame_num, slot], best, places=3)
+
+                if track.get('has_ball'):
+                    expected = -1
+                    if track['position_transformed'] and track['team']:
+                        expected = sum(1 for other in frame.values()
+                                       if other['team'] and other['team'] != track['team']
+                                       and other['position_transformed']
+                                       and measure_distance(track['position_transformed'], other['position_transformed']) <= 10)
+                    self.assertEqual(counts[frame_num], expected)
+
+    def test_team_compactness(self):
+        tracks = [
+            {1: player(0, 0, 1), 2: player(4, 0, 1), 3: player(2, 6, 2)},
+            {1: player(0, 0, 1), 3: player(2, 6, 2)},
+        ]
+        compactness = SpatialIndex.from_tracks(tracks).team_compactness(1)
+
+        self.assertAlmostEqual(compactness["spread"][0], 2.0)
+        self.assertAlmostEqual(compactness["length"][0], 4.0)
+        self.assertAlmostEqual(compactness["width"][0], 0.0)
+        self.assertTrue(np.isnan(compactness["spread"][1]))
+
+    def test_summary(self):
+        summary = proximity_summary(SpatialIndex.from_tracks(random_tracks()), radius=10)
+
+        self.assertEqual(summary["pressure_radius_m"], 10)
+        self.assertEqual(set(summary["teams"]), {1, 2})
+        self.assertTrue(all(player["team"] in (0, 1, 2) for player in summary["players"].values()))
+
+    def test_empty(self):
+        index = SpatialIndex.from_tracks([{}, {}])
+        opponent_ids, distances = index.nearest_opponents()
+        self.assertEqual(opponent_ids.shape, (2, 0))
+        self.assertEqual(index.opponents_near_carrier().tolist(), [-1, -1])
+        self.assertEqual(proximity_summary(index)["players"], {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from stats_store import StatsStore, compute_player_kinematics
+
+def make_summary(team1_goals, team1_passes):
+    return {
+        "version": "1.0",
+        "goals": {"team1": team1_goals, "team2": 0,
+                  "events": [{"type": "goal", "frame": 48, "timestamp": 2.0, "team": 1}] * team1_goals},
+        "passes": {"team1": team1_passes, "team2": 3},
+        "possession": {"team1_pct": 55.0, "team2_pct": 40.0, "unknown_pct": 5.0},
+        "video": {"frames": 240, "fps": 24.0, "duration_sec": 10.0}
+    }
+
+class TestStatsStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StatsStore(':memory:')
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_reingest_replaces_only_that_match(self):
+        """Re-ingesting a match replaces its rows and leaves others alone"""
+        players = [{"player_id": 4, "team": 1, "frames": 240, "distance_m": 30.0, "max_speed_kmh": 20.0}]
+        self.store.ingest_match("a", make_summary(1, 10), players, team_names={1: "Reds", 2: "Blues"})
+        self.store.ingest_match("b", make_summary(2, 5), players, team_names={1: "Reds", 2: "Greens"})
+        self.store.ingest_match("a", make_summary(0, 7), players, team_names={1: "Reds", 2: "Blues"})
+
+        self.assertEqual([m["match_id"] for m in self.store.matches()], ["a", "b"])
+        reds = self.store.team_totals(team_name="Reds")[0]
+        self.assertEqual((reds["matches"], reds["goals"], reds["passes"]), (2, 2, 12))
+        self.assertEqual([t["passes"] for t in self.store.match_team_stats("a")], [7, 3])
+        # The same tracker id in another match is another player
+        self.assertEqual([p["distance_m"] for p in self.store.player_totals("a", player_id=4)], [30.0])
+        self.assertEqual(self.store.event_counts(event_type="goal"), [{"match_id": "b", "type": "goal", "count": 2}])
+        self.assertEqual(self.store.get_summary("a")["passes"]["team1"], 7)
+
+    def test_aggregates_over_many_matches(self):
+        """Aggregates over hundreds of matches stay fast, and are by team name, not cluster number"""
+        for i in range(300):
+            # Reds are team 1 in even matches and team 2 in odd ones; the other side changes
+            names = {1: "Reds", 2: f"Opponent {i}"} if i % 2 == 0 else {1: f"Opponent {i}", 2: "Reds"}
+            self.store.ingest_match(f"match_{i}", make_summary(i % 3, 10), team_names=names)
+        self.store.ingest_match("unnamed", make_summary(5, 10))
+
+        start = time.perf_counter()
+        totals = self.store.team_totals()
+        reds = self.store.team_totals(team_name="Reds")[0]
+        counts = self.store.event_counts(event_type="goal", team=1, t1=1.0, t2=3.0)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(totals), 301)
+        self.assertEqual(reds["matches"], 300)
+        # Team 1 goals only count for the Reds in the matches they were team 1
+        self.assertEqual(reds["goals"], sum(i % 3 for i in range(0, 300, 2)))
+        self.assertEqual(reds["passes"], 150 * 10 + 150 * 3)
+        self.assertEqual(sum(c["count"] for c in counts), 305)
+        self.assertLess(elapsed, 0.5)
+
+    def test_player_kinematics(self):
+        """Distance and speed come from transformed positions"""
+        tracks = {'players': [
+            {3: {'position_transformed': [0.0, 0.0], 'team': 2, 'has_ball': True}},
+            {3: {'position_transformed': [0.5, 0.0], 'team': 2}},
+            {3: {'position_transformed': None, 'team': 2}},
+            {3: {'position_transformed': [1.5, 0.0], 'team': 2}},
+            {3: {'position_transformed': [30.0, 0.0], 'team': 2}},  # tracking jump
+        ]}
+        kinematics = compute_player_kinematics(tracks, 10)
+
+        self.assertEqual(len(kinematics), 1)
+        self.assertEqual(kinematics[0]["team"], 2)
+        self.assertEqual(kinematics[0]["frames"], 5)
+        self.assertEqual(kinematics[0]["ball_frames"], 1)
+        self.assertEqual(kinematics[0]["distance_m"], 1.5)
+        self.assertEqual(kinematics[0]["max_speed_kmh"], 18.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from team_assigner import TeamAssigner, KitLibrary
+
+RED = (30, 30, 220)
+BLUE = (220, 60, 30)
+YELLOW = (0, 230, 230)
+
+def make_frame(players):
+    """Green pitch with a solid-colour 'shirt' inside each player bbox"""
+    frame = np.zeros((200, 400, 3), dtype=np.uint8)
+    frame[:, :] = (40, 140, 40)
+    detections = {}
+    for player_id, (x, color) in players.items():
+        frame[40:100, x + 4:x + 16] = color
+        detections[player_id] = {"bbox": [x, 30, x + 20, 150]}
+    return frame, detections
+
+class TestKitLibrary(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'kits.json')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_incremental_update_and_persistence(self):
+        """Prototypes are count-weighted means that survive a reload"""
+        library = KitLibrary(self.path)
+        library.update("Reds", "home", [[0, 0, 200], [0, 0, 220]])
+        library.update("Reds", "home", [[0, 0, 240]])
+        library.save()
+
+        reloaded = KitLibrary(self.path)
+        np.testing.assert_allclose(reloaded.get_color("Reds", "home"), [0, 0, 220])
+        self.assertEqual(reloaded.teams["Reds"]["home"]["count"], 3)
+        self.assertIsNone(reloaded.get_prototypes({1: ("Reds", "home"), 2: ("Blues", "away")}))
+
+    def test_prototype_classification_skips_clustering(self):
+        """Known teams are classified by nearest prototype, goalkeepers included"""
+        library = KitLibrary()
+        library.update("Reds", "home", [RED])
+        library.update("Blues", "away", [BLUE])
+        library.update("Blues", "goalkeeper", [YELLOW])
+
+        team_assigner = TeamAssigner(library, {1: ("Reds", "home"), 2: ("Blues", "away")})
+        self.assertTrue(team_assigner.has_prototypes())
+        self.assertFalse(hasattr(team_assigner, 'kmeans'))
+
+        frame, detections = make_frame({1: (20, RED), 2: (120, BLUE), 3: (220, YELLOW)})
+        teams = {player_id: team_assigner.get_player_team(frame, d["bbox"], player_id)
+                 for player_id, d in detections.items()}
+        self.assertEqual(teams, {1: 1, 2: 2, 3: 2})
+
+        team_assigner.update_kit_library()
+        self.assertEqual(library.teams["Blues"]["goalkeeper"]["count"], 2)
+        self.assertEqual(library.teams["Reds"]["home"]["count"], 2)
+
+    def test_clustering_aligned_to_known_kit(self):
+        """When only one kit is known, clusters are ordered to match it"""
+        library = KitLibrary()
+        library.update("Blues", "away", [BLUE])
+
+        team_assigner = TeamAssigner(library, {1: ("Reds", "home"), 2: ("Blues", "away")})
+        self.assertFalse(team_assigner.has_prototypes())
+
+        frame, detections = make_frame({1: (20, BLUE), 2: (80, BLUE), 3: (200, RED), 4: (300, RED)})
+        team_assigner.assign_team_color(frame, detections)
+        for player_id, detection in detections.items():
+            team_assigner.get_player_team(frame, detection["bbox"], player_id)
+
+        self.assertEqual(team_assigner.player_team_dict, {1: 2, 2: 2, 3: 1, 4: 1})
+        team_assigner.update_kit_library()
+        self.assertTrue(library.has_kit("Reds", "home"))
+
+    def test_first_match_needs_confirmed_mapping(self):
+        """With neither kit known, which cluster is home is a guess and is not stored unconfirmed"""
+        library = KitLibrary()
+        team_assigner = TeamAssigner(library, {1: ("Reds", "home"), 2: ("Blues", "away")})
+
+        frame, detections = make_frame({1: (20, BLUE), 2: (80, BLUE), 3: (200, RED), 4: (300, RED)})
+        team_assigner.assign_team_color(frame, detections)
+        for player_id, detection in detections.items():
+            team_assigner.get_player_team(frame, detection["bbox"], player_id)
+
+        self.assertFalse(team_assigner.update_kit_library())
+        self.assertEqual(library.teams, {})
+
+        self.assertTrue(team_assigner.update_kit_library(confirm_mapping=True))
+        np.testing.assert_allclose(library.get_color("Reds", "home"), team_assigner.team_colors[1], atol=1e-6)
+        np.testing.assert_allclose(library.get_color("Blues", "away"), team_assigner.team_colors[2], atol=1e-6)
+
+    def test_goalkeeper_kit_learned_from_outliers(self):
+        """A goalkeeper clustered with a team becomes its goalkeeper kit, not part of its outfield kit"""
+        library = KitLibrary()
+        library.update("Blues", "away", [BLUE])
+        team_assigner = TeamAssigner(library, {1: ("Reds", "home"), 2: ("Blues", "away")})
+
+        frame, detections = make_frame({1: (20, RED), 2: (70, RED), 3: (120, RED), 4: (170, YELLOW),
+                                        5: (220, BLUE), 6: (270, BLUE), 7: (320, BLUE)})
+        team_assigner.assign_team_color(frame, detections)
+        for player_id, detection in detections.items():
+            team_assigner.get_player_team(frame, detection["bbox"], player_id)
+        self.assertEqual(team_assigner.player_team_dict[4], team_assigner.player_team_dict[1])
+
+        self.assertTrue(team_assigner.update_kit_library())
+        np.testing.assert_allclose(library.get_color("Reds", "home"), RED, atol=2)
+        np.testing.assert_allclose(library.get_color("Reds", "goalkeeper"), YELLOW, atol=2)
+        self.assertFalse(library.has_kit("Blues", "goalkeeper"))
+
+        # The next match classifies the goalkeeper from the learned prototype
+        next_match = TeamAssigner(library, {1: ("Reds", "home"), 2: ("Blues", "away")})
+        self.assertEqual(next_match.get_player_team(frame, detections[4]["bbox"], 4), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+import json
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from events.timeline import PossessionTimeline
+
+class TestPossessionTimeline(unittest.TestCase):
+
+    def setUp(self):
+        # 10 fps: team 1 for 3s, unknown 1s, team 2 for 6s
+        self.team_ball_control = [1] * 30 + [0] * 10 + [2] * 60
+        self.player_ball_control = [7] * 15 + [8] * 15 + [-1] * 10 + [9] * 60
+        self.events = [
+            {"type": "pass", "frame": 15, "timestamp": 1.5, "team": 1, "passer": 7, "receiver": 8},
+            {"type": "pass", "frame": 70, "timestamp": 7.0, "team": 2, "passer": 9, "receiver": 10},
+            {"type": "goal", "frame": 90, "timestamp": 9.0, "team": 2},
+        ]
+        self.timeline = PossessionTimeline.from_frames(self.team_ball_control,
+                                                       self.player_ball_control,
+                                                       10,
+                                                       self.events)
+
+    def test_run_length_spells(self):
+        """Per-frame arrays are collapsed into spells"""
+        self.assertEqual(self.timeline.team_spells, [(1, 0, 30), (2, 40, 100)])
+        self.assertEqual(self.timeline.player_spells, [(7, 1, 0, 15), (8, 1, 15, 30), (9, 2, 40, 100)])
+
+    def test_possession_pct_range(self):
+        """Possession percentages match a brute-force count over any range"""
+        for t1, t2 in [(0, 10), (2, 5), (3.5, 4), (0, 3)]:
+            window = self.team_ball_control[int(t1 * 10):int(t2 * 10)]
+            expected = round(window.count(1) / len(window) * 100, 1)
+            self.assertEqual(self.timeline.possession_pct(t1, t2)["team1_pct"], expected)
+        self.assertEqual(self.timeline.possession_pct(), {"team1_pct": 30.0, "team2_pct": 60.0, "unknown_pct": 10.0})
+        self.assertAlmostEqual(self.timeline.player_possession_sec(8, 0, 2), 0.5)
+
+    def test_queries(self):
+        """Passes by player, events in range and long spells"""
+        second_half = self.timeline.half_range(2)
+        self.assertEqual(len(self.timeline.passes_by(9, *second_half)), 1)
+        self.assertEqual(self.timeline.passes_by(7, *second_half), [])
+        self.assertEqual(len(self.timeline.passes_by(8, as_receiver=True)), 1)
+        self.assertEqual([e["type"] for e in self.timeline.events_between(5, 10)], ["pass", "goal"])
+        self.assertEqual(len(self.timeline.events_between(event_type="goal")), 1)
+
+        long_spells = self.timeline.spells_longer_than(5)
+        self.assertEqual(len(long_spells), 1)
+        self.assertEqual(long_spells[0]["team"], 2)
+        self.assertEqual(len(self.timeline.spells_longer_than(1, kind="player")), 3)
+        self.assertEqual([s["team"] for s in self.timeline.spells_between(2, 5)], [1, 2])
+
+    def test_serialization(self):
+        """Timeline round-trips through JSON"""
+        data = json.loads(json.dumps(self.timeline.to_dict()))
+        restored = PossessionTimeline.from_dict(data)
+        self.assertEqual(restored.possession_pct(1, 8), self.timeline.possession_pct(1, 8))
+        self.assertEqual(len(restored.passes_by(7)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
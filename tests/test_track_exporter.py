@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from track_exporter import export_tracks, export_events, export_player_positions, read_tracks, read_player_positions, file_info
+
+class TestTrackExporter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tracks = {'players': [], 'referees': [], 'ball': []}
+        for frame_num in range(20):
+            x = 100 + frame_num
+            self.tracks['players'].append({
+                1: {'bbox': [x, 100, x + 20, 140], 'position': (x + 10, 140),
+                    'position_transformed': [float(frame_num), 5.0], 'team': 1, 'has_ball': frame_num < 5},
+                2: {'bbox': [300, 100, 320, 140], 'position': (310, 140),
+                    'position_transformed': None, 'team': 2},
+            })
+            self.tracks['referees'].append({})
+            self.tracks['ball'].append({1: {'bbox': [x, 135, x + 10, 145]}})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip_with_row_groups(self):
+        """Rows are grouped by frame range and filters skip the rest"""
+        path = os.path.join(self.tmp_dir.name, 'tracks.parquet')
+        rows = export_tracks(self.tracks, path, fps=24, row_group_frames=5)
+
+        self.assertEqual(rows, 60)
+        self.assertEqual(file_info(path), (4, 60))
+
+        table = read_tracks(path, columns=['frame', 'track_id'], frame_range=(5, 10), object_type='players')
+        self.assertEqual(table.column_names, ['frame', 'track_id'])
+        self.assertEqual(sorted(set(table.column('frame').to_pylist())), [5, 6, 7, 8, 9])
+        self.assertEqual(table.num_rows, 10)
+
+    def test_player_positions(self):
+        """Single player projection returns frames and transformed positions"""
+        path = os.path.join(self.tmp_dir.name, 'tracks.parquet')
+        export_tracks(self.tracks, path)
+
+        frames, xy = read_player_positions(path, 1, frame_range=(10, 20))
+        self.assertEqual(frames.tolist(), list(range(10, 20)))
+        self.assertEqual(xy[:, 0].tolist(), [float(f) for f in range(10, 20)])
+
+        table = read_tracks(path, columns=['has_ball'], track_id=1, object_type='players')
+        self.assertEqual(sum(table.column('has_ball').to_pylist()), 5)
+
+    def test_player_positions_zero_copy(self):
+        """The Arrow export returns the Parquet positions as read-only views on the file"""
+        parquet_path = os.path.join(self.tmp_dir.name, 'tracks.parquet')
+        arrow_path = os.path.join(self.tmp_dir.name, 'positions.arrow')
+        export_tracks(self.tracks, parquet_path)
+        self.assertEqual(export_player_positions(self.tracks, arrow_path, fps=24), 40)
+
+        for player_id in (1, 2):
+            expected_frames, expected_xy = read_player_positions(parquet_path, player_id, frame_range=(10, 20))
+            frames, xy = read_player_positions(arrow_path, player_id, frame_range=(10, 20))
+            self.assertEqual(frames.tolist(), expected_frames.tolist())
+            np.testing.assert_array_equal(xy, expected_xy)
+            self.assertFalse(xy.flags.writeable)
+
+        frames, xy = read_player_positions(arrow_path, 1, position='position')
+        self.assertEqual(frames.tolist(), list(range(20)))
+        self.assertEqual(xy[0].tolist(), [110.0, 140.0])
+        self.assertEqual(read_player_positions(arrow_path, 7)[1].shape, (0, 2))
+
+    def test_events(self):
+        """Goal events are written with empty player columns"""
+        path = os.path.join(self.tmp_dir.name, 'events.parquet')
+        export_events([{'frame': 12, 'timestamp': 0.5, 'team': 2}], path)
+
+        events = read_tracks(path).to_pylist()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['type'], 'goal')
+        self.assertEqual(events[0]['team'], 2)
+        self.assertIsNone(events[0]['player_id'])
+
+if __name__ == '__main__':
+    unittest.main()
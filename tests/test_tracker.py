@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import numpy as np
+import torch
+import supervision as sv
+from ultralytics.engine.results import Results
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from trackers import Tracker
+
+NAMES = {0: 'ball', 1: 'goalkeeper', 2: 'player', 3: 'referee'}
+
+class FakeDetector:
+    """One player per frame, at the x position written into pixel (0, 0)"""
+    def __init__(self):
+        self.frames_seen = 0
+
+    def predict(self, images, conf=0.25, **kwargs):
+        results = []
+        for image in images:
+            self.frames_seen += 1
+            x = float(image[0, 0, 0]) * 10
+            boxes = torch.tensor([[x, 100, x + 40, 200, 0.9, 2]], dtype=torch.float32)
+            results.append(Results(image, path="", names=NAMES, boxes=boxes))
+        return results
+
+def make_frames(xs):
+    frames = []
+    for x in xs:
+        frame = np.zeros((360, 640, 3), dtype=np.uint8)
+        frame[0, 0, 0] = x // 10
+        frames.append(frame)
+    return frames
+
+def make_tracker():
+    tracker = Tracker.__new__(Tracker)
+    tracker.model = FakeDetector()
+    tracker.tracker = sv.ByteTrack()
+    return tracker
+
+class TestTrackerScenes(unittest.TestCase):
+
+    def test_skips_non_live_frames_and_keeps_ids_unique_across_cuts(self):
+        # Shot A, hard cut to an unrelated shot B, a close-up, then shot C
+        xs = [100] * 5 + [500] * 5 + [0] * 3 + [300] * 5
+        scenes = {"cuts": [5, 10, 13], "live": [True] * 10 + [False] * 3 + [True] * 5}
+        tracker = make_tracker()
+
+        tracks = tracker.get_object_tracks(make_frames(xs), refine_ball=False, scenes=scenes)
+
+        self.assertEqual(tracker.model.frames_seen, 15)
+        self.assertEqual(tracker.skipped_frames, 3)
+        self.assertEqual(tracks["players"][10:13], [{}, {}, {}])
+
+        shot_ids = [set().union(*[frame.keys() for frame in tracks["players"][start:end]])
+                    for start, end in [(0, 5), (5, 10), (13, 18)]]
+        self.assertTrue(all(len(ids) == 1 for ids in shot_ids))
+        # reset() restarts ByteTrack's counter; each shot still gets a new id
+        self.assertEqual(len(set().union(*shot_ids)), 3)
+
+    def test_frame_callback(self):
+        tracker = make_tracker()
+        calls = []
+
+        def callback(frame_num, tracks):
+            calls.append((frame_num, len(tracks["players"])))
+
+        tracker.get_object_tracks(make_frames([100] * 4), refine_ball=False, frame_callback=callback)
+
+        # Called once per frame, as soon as that frame is tracked
+        self.assertEqual(calls, [(0, 1), (1, 2), (2, 3), (3, 4)])
+
+    def test_detection_frames_scaled_to_full_resolution(self):
+        """Boxes detected on half-size frames come back in full-resolution pixels"""
+        tracker = make_tracker()
+        frames = [np.zeros((720, 1280, 3), dtype=np.uint8)] * 2
+        detection_frames = make_frames([100, 100])
+
+        tracks = tracker.get_object_tracks(frames, refine_ball=False, detection_frames=detection_frames)
+
+        np.testing.assert_allclose(list(tracks["players"][1].values())[0]["bbox"], [200, 200, 280, 400], atol=1)
+
+if __name__ == '__main__':
+    unittest.main()
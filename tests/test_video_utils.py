@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import tempfile
+import cv2
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils import read_video, decode_video, decode_video_parallel, read_crops, get_video_info
+from utils.video_utils import get_decode_segments
+
+class TestVideoUtils(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.video_path = os.path.join(cls.tmp_dir.name, 'synthetic.avi')
+        out = cv2.VideoWriter(cls.video_path, cv2.VideoWriter_fourcc(*'MJPG'), 24, (320, 240))
+        for i in range(30):
+            frame = np.zeros((240, 320, 3), dtype=np.uint8)
+            frame[:, :, 2] = i * 8  # frame index encoded in the red channel
+            out.write(frame)
+        out.release()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def frame_index(self, bgr_frame):
+        return int(round(bgr_frame[:, :, 2].mean() / 8))
+
+    def test_decode_outputs_and_stride(self):
+        """Each output has the requested representation and stride skips frames"""
+        decoded = decode_video(self.video_path, outputs=("bgr", "inference", "gray"),
+                               inference_size=(160, 96), gray_scale=0.5, stride=3)
+
+        self.assertEqual(decoded["frame_indices"], list(range(0, 30, 3)))
+        self.assertEqual(decoded["bgr"][0].shape, (240, 320, 3))
+        self.assertEqual(decoded["inference"][0].shape, (96, 160, 3))
+        self.assertEqual(decoded["gray"][0].shape, (120, 160))
+        self.assertEqual([self.frame_index(f) for f in decoded["bgr"]], decoded["frame_indices"])
+        self.assertEqual(len(decode_video(self.video_path)["bgr"]), len(read_video(self.video_path)))
+
+    def test_parallel_matches_serial(self):
+        """Segment decoding across processes returns the same frames in order"""
+        self.assertEqual(get_video_info(self.video_path)["frames"], 30)
+        self.assertEqual(get_decode_segments(30, 4, stride=2, gop_size=7), [(0, 14), (14, 28), (28, 30)])
+
+        serial = decode_video(self.video_path, outputs=("inference",), stride=2)
+        parallel = decode_video_parallel(self.video_path, num_workers=3, gop_size=5,
+                                         outputs=("inference",), stride=2)
+
+        self.assertEqual(parallel["frame_indices"], serial["frame_indices"])
+        for a, b in zip(parallel["inference"], serial["inference"]):
+            np.testing.assert_array_equal(a, b)
+
+    def test_parallel_full_resolution_outputs(self):
+        """Full-res BGR and grey decoded in parallel match serial, and no buffer files are left behind"""
+        from utils import video_utils
+        buffers_before = set(os.listdir(video_utils.DECODE_BUFFER_DIR))
+
+        serial = decode_video(self.video_path, outputs=("bgr", "gray"), gray_scale=0.5)
+        parallel = decode_video_parallel(self.video_path, num_workers=3, gop_size=5,
+                                         outputs=("bgr", "gray"), gray_scale=0.5)
+
+        self.assertEqual(parallel["frame_indices"], list(range(30)))
+        self.assertEqual([self.frame_index(f) for f in parallel["bgr"]], parallel["frame_indices"])
+        for output in ("bgr", "gray"):
+            self.assertEqual(len(parallel[output]), 30)
+            for a, b in zip(parallel[output], serial[output]):
+                np.testing.assert_array_equal(a, b)
+        self.assertEqual(set(os.listdir(video_utils.DECODE_BUFFER_DIR)), buffers_before)
+
+    def test_read_crops(self):
+        """Crops are cut from the requested full-resolution frames"""
+        crops = read_crops(self.video_path, {20: [[10, 20, 50, 60]], 5: [[0, 0, 8, 8], [100, 100, 120, 110]]})
+
+        self.assertEqual(sorted(crops), [5, 20])
+        self.assertEqual(crops[20][0].shape, (40, 40, 3))
+        self.assertEqual(crops[5][1].shape, (10, 20, 3))
+        self.assertEqual(self.frame_index(crops[20][0]), 20)
+        self.assertEqual(self.frame_index(crops[5][0]), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1 @@
+from .track_exporter import export_tracks, export_events, export_player_positions, read_tracks, read_player_positions, tracks_to_table, events_to_table, file_info
\ No newline at end of file
@@ -0,0 +1,321 @@
+import os
+import json
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Frames per row group - readers skip whole row groups outside a frame range
+ROW_GROUP_FRAMES = int(os.getenv('ROW_GROUP_FRAMES', '250'))
+
+TRACKS_SCHEMA = pa.schema([
+    ('frame', pa.int32()),
+    ('object', pa.dictionary(pa.int8(), pa.string())),
+    ('track_id', pa.int32()),
+    ('x1', pa.float32()),
+    ('y1', pa.float32()),
+    ('x2', pa.float32()),
+    ('y2', pa.float32()),
+    ('position_x', pa.float32()),
+    ('position_y', pa.float32()),
+    ('position_adjusted_x', pa.float32()),
+    ('position_adjusted_y', pa.float32()),
+    ('position_transformed_x', pa.float32()),
+    ('position_transformed_y', pa.float32()),
+    ('team', pa.int8()),
+    ('has_ball', pa.bool_()),
+])
+
+POSITION_COLUMNS = ('position', 'position_adjusted', 'position_transformed')
+
+# Uncompressed Arrow IPC layout for zero-copy position reads: one record batch,
+# rows sorted by (track_id, frame), each position an (x, y) pair with NaN for
+# missing values so no column carries a validity buffer
+POSITIONS_SCHEMA = pa.schema([
+    ('frame', pa.int32()),
+    ('track_id', pa.int32()),
+    *[(column, pa.list_(pa.float32(), 2)) for column in POSITION_COLUMNS],
+])
+
+EVENTS_SCHEMA = pa.schema([
+    ('frame', pa.int32()),
+    ('timestamp', pa.float32()),
+    ('type', pa.dictionary(pa.int8(), pa.string())),
+    ('team', pa.int8()),
+    ('player_id', pa.int32()),
+    ('receiver_id', pa.int32()),
+])
+
+
+def _xy(point):
+    if point is None:
+        return None, None
+    return float(point[0]), float(point[1])
+
+
+def tracks_to_table(tracks):
+    """
+    Flatten the nested tracks structure into a columnar Arrow table.
+
+    Args:
+        tracks: Dictionary of object type -> list of per-frame {track_id: info} dicts
+                as produced by Tracker.get_object_tracks and the position stages
+
+    Returns:
+        pyarrow.Table with one row per (frame, object, track_id), sorted by frame
+    """
+    columns = {name: [] for name in TRACKS_SCHEMA.names}
+
+    num_frames = max((len(object_tracks) for object_tracks in tracks.values()), default=0)
+    for frame_num in range(num_frames):
+        for object, object_tracks in tracks.items():
+            if frame_num >= len(object_tracks):
+                continue
+            for track_id, track_info in object_tracks[frame_num].items():
+                bbox = track_info['bbox']
+                position_x, position_y = _xy(track_info.get('position'))
+                adjusted_x, adjusted_y = _xy(track_info.get('position_adjusted'))
+                transformed_x, transformed_y = _xy(track_info.get('position_transformed'))
+                team = track_info.get('team')
+
+                columns['frame'].append(frame_num)
+                columns['object'].append(object)
+                columns['track_id'].append(int(track_id))
+                columns['x1'].append(float(bbox[0]))
+                columns['y1'].append(float(bbox[1]))
+                columns['x2'].append(float(bbox[2]))
+                columns['y2'].append(float(bbox[3]))
+                columns['position_x'].append(position_x)
+                columns['position_y'].append(position_y)
+                columns['position_adjusted_x'].append(adjusted_x)
+                columns['position_adjusted_y'].append(adjusted_y)
+                columns['position_transformed_x'].append(transformed_x)
+                columns['position_transformed_y'].append(transformed_y)
+                columns['team'].append(int(team) if team is not None else None)
+                columns['has_ball'].append(bool(track_info.get('has_ball', False)))
+
+    return pa.Table.from_pydict(columns, schema=TRACKS_SCHEMA)
+
+
+def events_to_table(events):
+    """
+    Convert detected events into a columnar Arrow table.
+
+    Args:
+        events: List of event dicts with "frame", "timestamp" and optionally
+                "type", "team", "player_id"/"passer" and "receiver_id"/"receiver"
+
+    Returns:
+        pyarrow.Table with one row per event, sorted by frame
+    """
+    columns = {name: [] for name in EVENTS_SCHEMA.names}
+
+    for event in sorted(events, key=lambda e: e['frame']):
+        player_id = event.get('player_id', event.get('passer'))
+        receiver_id = event.get('receiver_id', event.get('receiver'))
+        team = event.get('team')
+
+        columns['frame'].append(int(event['frame']))
+        columns['timestamp'].append(float(event['timestamp']))
+        columns['type'].append(event.get('type', 'goal'))
+        columns['team'].append(int(team) if team is not None else None)
+        columns['player_id'].append(int(player_id) if player_id is not None else None)
+        columns['receiver_id'].append(int(receiver_id) if receiver_id is not None else None)
+
+    return pa.Table.from_pydict(columns, schema=EVENTS_SCHEMA)
+
+
+def _write_by_frame(table, path, fps, row_group_frames):
+    # Row groups hold a fixed number of frames, so the per-group frame min/max
+    # statistics let readers skip everything outside a requested range
+    metadata = {b'fps': str(fps).encode()} if fps else {}
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+
+    frames = table.column('frame').to_numpy()
+    with pq.ParquetWriter(path, table.schema, compression='zstd') as writer:
+        if len(frames) == 0:
+            writer.write_table(table)
+            return
+        start = 0
+        while start < len(frames):
+            group_end_frame = (frames[start] // row_group_frames + 1) * row_group_frames
+            end = start + int((frames[start:] < group_end_frame).sum())
+            writer.write_table(table.slice(start, end - start))
+            start = end
+
+
+def export_tracks(tracks, path, fps=None, row_group_frames=ROW_GROUP_FRAMES):
+    """
+    Write per-frame tracks to a Parquet file.
+
+    Args:
+        tracks: Dictionary of object type -> per-frame track dicts
+        path: Output .parquet path
+        fps: Frames per second, stored in the file metadata
+        row_group_frames: Number of frames per row group
+
+    Returns:
+        Number of rows written
+    """
+    table = tracks_to_table(tracks)
+    _write_by_frame(table, path, fps, row_group_frames)
+    return table.num_rows
+
+
+def export_events(events, path, fps=None, row_group_frames=ROW_GROUP_FRAMES):
+    """
+    Write detected events to a Parquet file.
+
+    Args:
+        events: List of event dicts (see events_to_table)
+        path: Output .parquet path
+        fps: Frames per second, stored in the file metadata
+        row_group_frames: Number of frames per row group
+
+    Returns:
+        Number of rows written
+    """
+    table = events_to_table(events)
+    _write_by_frame(table, path, fps, row_group_frames)
+    return table.num_rows
+
+
+def export_player_positions(tracks, path, fps=None):
+    """
+    Write player positions to an uncompressed Arrow IPC file.
+
+    Unlike the Parquet export, the file can be read without decoding:
+    read_player_positions memory-maps it and returns views on the mapping.
+    Each player's rows are contiguous, and their offsets are stored in the
+    schema metadata.
+
+    Args:
+        tracks: Dictionary of object type -> per-frame track dicts
+        path: Output .arrow path
+        fps: Frames per second, stored in the file metadata
+
+    Returns:
+        Number of rows written
+    """
+    rows = sorted((int(track_id), frame_num, track_info)
+                  for frame_num, frame in enumerate(tracks.get('players', []))
+                  for track_id, track_info in frame.items())
+
+    track_offsets = {}
+    for row_num, (track_id, _, _) in enumerate(rows):
+        start, length = track_offsets.get(track_id, (row_num, 0))
+        track_offsets[track_id] = (start, length + 1)
+
+    columns = {
+        'frame': pa.array([frame_num for _, frame_num, _ in rows], pa.int32()),
+        'track_id': pa.array([track_id for track_id, _, _ in rows], pa.int32()),
+    }
+    for column in POSITION_COLUMNS:
+        xy = np.full((len(rows), 2), np.nan, dtype=np.float32)
+        for row_num, (_, _, track_info) in enumerate(rows):
+            if track_info.get(column) is not None:
+                xy[row_num] = _xy(track_info[column])
+        columns[column] = pa.FixedSizeListArray.from_arrays(pa.array(xy.ravel()), 2)
+
+    metadata = {b'track_offsets': json.dumps(track_offsets).encode()}
+    if fps:
+        metadata[b'fps'] = str(fps).encode()
+    batch = pa.RecordBatch.from_pydict(columns, schema=POSITIONS_SCHEMA.with_metadata(metadata))
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return batch.num_rows
+
+
+def read_tracks(path, columns=None, frame_range=None, object_type=None, track_id=None):
+    """
+    Read a projection of an exported tracks or events file.
+
+    The file is memory-mapped, only the requested columns are decoded and row
+    groups outside frame_range are skipped using their statistics.
+
+    Args:
+        path: Parquet file written by export_tracks or export_events
+        columns: Column names to load (None loads all)
+        frame_range: Optional (start, end) frame range, end exclusive
+        object_type: Optional object filter, e.g. "players"
+        track_id: Optional track id filter
+
+    Returns:
+        pyarrow.Table
+    """
+    filters = []
+    if frame_range is not None:
+        filters.append(('frame', '>=', int(frame_range[0])))
+        filters.append(('frame', '<', int(frame_range[1])))
+    if object_type is not None:
+        filters.append(('object', '==', object_type))
+    if track_id is not None:
+        filters.append(('track_id', '==', int(track_id)))
+
+    return pq.read_table(path,
+                         columns=columns,
+                         filters=filters or None,
+                         memory_map=True)
+
+
+def _is_arrow_file(path):
+    with open(path, 'rb') as f:
+        return f.read(6) == b'ARROW1'
+
+
+def _read_ipc_player_positions(path, player_id, frame_range, position):
+    # Slices of a memory-mapped record batch: the returned arrays are
+    # read-only views on the file, nothing is decoded or copied
+    reader = pa.ipc.open_file(pa.memory_map(path))
+    batch = reader.get_batch(0)
+    track_offsets = json.loads(reader.schema.metadata[b'track_offsets'])
+    start, length = track_offsets.get(str(int(player_id)), (0, 0))
+
+    frames = batch.column('frame').slice(start, length).to_numpy()
+    xy = batch.column(position).slice(start, length).flatten().to_numpy().reshape(-1, 2)
+    if frame_range is not None:
+        first, last = np.searchsorted(frames, frame_range)
+        frames, xy = frames[first:last], xy[first:last]
+    return frames, xy
+
+
+def read_player_positions(path, player_id, frame_range=None, position='position_transformed'):
+    """
+    Load one player's positions over a frame range.
+
+    From an export_player_positions file the result is zero-copy; from a
+    Parquet export_tracks file the requested columns are decoded.
+
+    Args:
+        path: Arrow file written by export_player_positions, or Parquet
+              file written by export_tracks
+        player_id: Player track id
+        frame_range: Optional (start, end) frame range, end exclusive
+        position: Position column prefix ("position", "position_adjusted"
+                  or "position_transformed")
+
+    Returns:
+        Tuple of numpy arrays (frames, xy) where xy has shape (n, 2);
+        missing positions are NaN
+    """
+    if _is_arrow_file(path):
+        return _read_ipc_player_positions(path, player_id, frame_range, position)
+
+    table = read_tracks(path,
+                        columns=['frame', f'{position}_x', f'{position}_y'],
+                        frame_range=frame_range,
+                        object_type='players',
+                        track_id=player_id)
+    frames = table.column('frame').to_numpy()
+    xy = np.column_stack([
+        table.column(f'{position}_x').to_numpy(zero_copy_only=False),
+        table.column(f'{position}_y').to_numpy(zero_copy_only=False),
+    ])
+    return frames, xy
+
+
+def file_info(path):
+    """
+    Return (num_row_groups, num_rows) of an exported file without reading any data.
+    """
+    metadata = pq.ParquetFile(path, memory_map=True).metadata
+    return metadata.num_row_groups, metadata.num_rows
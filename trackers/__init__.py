@@ -1 +1,3 @@
-from .tracker import Tracker
\ No newline at end of file
+from .tracker import Tracker
+from .ball_refiner import BallRefiner
+from .detector_backend import TorchDetector, OnnxDetector, get_detector
\ No newline at end of file
@@ -0,0 +1,183 @@
+import os
+import time
+import numpy as np
+
+# Side of the square crop around the predicted ball position (pixels)
+BALL_ROI_SIZE = int(os.getenv('BALL_ROI_SIZE', '320'))
+# Inference size for crops and tiles - a 320px crop at 640 is a 2x upscale
+BALL_ROI_IMGSZ = int(os.getenv('BALL_ROI_IMGSZ', '640'))
+BALL_TILE_SIZE = int(os.getenv('BALL_TILE_SIZE', '640'))
+BALL_TILE_OVERLAP = float(os.getenv('BALL_TILE_OVERLAP', '0.2'))
+# After this many frames without a ball, the prediction is no longer trusted
+BALL_LOST_FRAMES = int(os.getenv('BALL_LOST_FRAMES', '12'))
+# While lost, only tile every Nth frame to bound the cost
+BALL_TILE_STRIDE = int(os.getenv('BALL_TILE_STRIDE', '3'))
+BALL_HISTORY = int(os.getenv('BALL_HISTORY', '5'))
+BALL_CONF = float(os.getenv('BALL_CONF', '0.1'))
+
+
+def _ball_center(ball_frame):
+    if not ball_frame or 1 not in ball_frame:
+        return None
+    x1, y1, x2, y2 = ball_frame[1]['bbox']
+    return (x1 + x2) / 2, (y1 + y2) / 2
+
+
+def predict_ball_position(ball_tracks, frame_num, history=BALL_HISTORY, max_lost=BALL_LOST_FRAMES, shot_start=0):
+    """
+    Extrapolate the ball centre at frame_num from recent detections.
+
+    Args:
+        ball_tracks: Per-frame ball dicts ({1: {"bbox": [...]}} or {})
+        frame_num: Frame to predict
+        history: Number of recent detections to fit
+        max_lost: Give up if the last detection is older than this
+        shot_start: First frame of the current shot; earlier detections are ignored
+
+    Returns:
+        (x, y) predicted centre, or None when the ball has been lost too long
+    """
+    frames = []
+    centers = []
+    for prev_frame in range(frame_num - 1, max(shot_start - 1, frame_num - 1 - max_lost - history * 2), -1):
+        center = _ball_center(ball_tracks[prev_frame])
+        if center is None:
+            continue
+        if not frames and frame_num - prev_frame > max_lost:
+            return None
+        frames.append(prev_frame)
+        centers.append(center)
+        if len(frames) == history:
+            break
+
+    if not frames:
+        return None
+    if len(frames) == 1:
+        return centers[0]
+
+    # Constant velocity fit over the recent detections
+    frames = np.array(frames, dtype=np.float64)
+    centers = np.array(centers, dtype=np.float64)
+    vx, x0 = np.polyfit(frames, centers[:, 0], 1)
+    vy, y0 = np.polyfit(frames, centers[:, 1], 1)
+    return float(vx * frame_num + x0), float(vy * frame_num + y0)
+
+
+def get_roi(center, frame_shape, roi_size=BALL_ROI_SIZE):
+    """
+    Square crop box around center, shifted to stay inside the frame.
+    """
+    height, width = frame_shape[:2]
+    roi_w = min(roi_size, width)
+    roi_h = min(roi_size, height)
+    x1 = int(min(max(center[0] - roi_w / 2, 0), width - roi_w))
+    y1 = int(min(max(center[1] - roi_h / 2, 0), height - roi_h))
+    return x1, y1, x1 + roi_w, y1 + roi_h
+
+
+def get_tiles(frame_shape, tile_size=BALL_TILE_SIZE, overlap=BALL_TILE_OVERLAP):
+    """
+    Overlapping tile boxes covering the whole frame.
+    """
+    height, width = frame_shape[:2]
+    step = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, step))
+        return positions + [length - tile_size]
+
+    return [(x, y, min(x + tile_size, width), min(y + tile_size, height))
+            for y in starts(height) for x in starts(width)]
+
+
+class BallRefiner:
+    """
+    Second, ball-only detection pass for frames where the full-frame pass
+    missed the ball. Runs the detector at high resolution on a small crop
+    around the predicted position, and on overlapping tiles once the ball
+    has been lost for a while.
+    """
+    def __init__(self, model, roi_size=BALL_ROI_SIZE, roi_imgsz=BALL_ROI_IMGSZ,
+                 tile_size=BALL_TILE_SIZE, conf=BALL_CONF, ball_class_name='ball'):
+        self.model = model
+        self.roi_size = roi_size
+        self.roi_imgsz = roi_imgsz
+        self.tile_size = tile_size
+        self.conf = conf
+
+        self.ball_class = [k for k, v in model.names.items() if v == ball_class_name][0]
+        self.stats = {"missing": 0, "roi_frames": 0, "tile_frames": 0,
+                      "recovered_roi": 0, "recovered_tiles": 0, "seconds": 0.0}
+
+    def _detect_in_boxes(self, frame, boxes, imgsz):
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes]
+        results = self.model.predict(crops, imgsz=imgsz, conf=self.conf,
+                                     classes=[self.ball_class], verbose=False)
+
+        best_bbox = None
+        best_conf = 0.0
+        for (x1, y1, _, _), result in zip(boxes, results):
+            if len(result.boxes) == 0:
+                continue
+            confs = result.boxes.conf.cpu().numpy()
+            i = int(confs.argmax())
+            if confs[i] > best_conf:
+                best_conf = float(confs[i])
+                bx1, by1, bx2, by2 = result.boxes.xyxy.cpu().numpy()[i].tolist()
+                best_bbox = [bx1 + x1, by1 + y1, bx2 + x1, by2 + y1]
+        return best_bbox
+
+    def refine(self, frames, ball_tracks, live=None, cuts=None):
+        """
+        Fill frames without a ball detection in place.
+
+        Args:
+            frames: Video frames
+            ball_tracks: tracks["ball"] from the full-frame pass
+            live: Optional per-frame mask; frames that are not live are skipped
+            cuts: Optional shot boundaries; no prediction uses detections from before a cut
+
+        Returns:
+            The same ball_tracks list
+        """
+        start_time = time.perf_counter()
+        frames_lost = 0
+        cuts = set(cuts or [])
+        shot_start = 0
+
+        for frame_num, frame in enumerate(frames):
+            if frame_num in cuts:
+                shot_start = frame_num
+                frames_lost = BALL_LOST_FRAMES
+            if ball_tracks[frame_num] and 1 in ball_tracks[frame_num]:
+                frames_lost = 0
+                continue
+            if live is not None and not live[frame_num]:
+                frames_lost = BALL_LOST_FRAMES
+                continue
+
+            self.stats["missing"] += 1
+            frames_lost += 1
+            predicted = predict_ball_position(ball_tracks, frame_num, shot_start=shot_start)
+
+            bbox = None
+            if predicted is not None:
+                self.stats["roi_frames"] += 1
+                roi = get_roi(predicted, frame.shape, self.roi_size)
+                bbox = self._detect_in_boxes(frame, [roi], self.roi_imgsz)
+                if bbox is not None:
+                    self.stats["recovered_roi"] += 1
+            elif frames_lost % BALL_TILE_STRIDE == 0:
+                self.stats["tile_frames"] += 1
+                bbox = self._detect_in_boxes(frame, get_tiles(frame.shape, self.tile_size), self.tile_size)
+                if bbox is not None:
+                    self.stats["recovered_tiles"] += 1
+
+            if bbox is not None:
+                ball_tracks[frame_num] = {1: {"bbox": bbox}}
+                frames_lost = 0
+
+        self.stats["seconds"] += time.perf_counter() - start_time
+        return ball_tracks
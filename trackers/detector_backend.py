@@ -0,0 +1,287 @@
+import ast
+import os
+import cv2
+import numpy as np
+import torch
+from ultralytics import YOLO
+from ultralytics.engine.results import Results
+
+# "torch" runs the .pt weights through ultralytics; "onnx" exports them once and runs onnxruntime
+DETECTOR_BACKEND = os.getenv('DETECTOR_BACKEND', 'torch')
+# Longest image side fed to the detector (multiple of 32); the model was trained at 640
+DETECTOR_IMGSZ = int(os.getenv('DETECTOR_IMGSZ', '640'))
+# Run the statically quantized INT8 ONNX model; it must first be calibrated
+# with OnnxDetector.quantize (see calibrate_detector.py)
+DETECTOR_INT8 = os.getenv('DETECTOR_INT8', '0') == '1'
+# Fewest frames quantize() accepts for activation calibration
+CALIBRATION_FRAMES = int(os.getenv('CALIBRATION_FRAMES', '16'))
+# Threads within one operator / across independent operators; 0 keeps the runtime default
+INTRA_OP_THREADS = int(os.getenv('INTRA_OP_THREADS', '0'))
+INTER_OP_THREADS = int(os.getenv('INTER_OP_THREADS', '0'))
+
+# ultralytics predict defaults, so both backends return the same boxes
+NMS_IOU = 0.7
+MAX_DETECTIONS = 300
+LETTERBOX_STRIDE = 32
+LETTERBOX_COLOR = (114, 114, 114)
+# Offset per class so one NMS call never suppresses boxes across classes
+CLASS_OFFSET = 7680
+
+
+def letterbox(image, imgsz, stride=LETTERBOX_STRIDE):
+    """
+    Resize keeping aspect ratio and pad to the next stride multiple, as
+    ultralytics does for rectangular inference (1920x1080 -> 640x384).
+
+    Returns:
+        (padded image, gain, (pad_left, pad_top))
+    """
+    height, width = image.shape[:2]
+    gain = min(imgsz / height, imgsz / width)
+    new_width, new_height = int(round(width * gain)), int(round(height * gain))
+    pad_width = ((imgsz - new_width) % stride) / 2
+    pad_height = ((imgsz - new_height) % stride) / 2
+
+    if (new_width, new_height) != (width, height):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_height - 0.1)), int(round(pad_height + 0.1))
+    left, right = int(round(pad_width - 0.1)), int(round(pad_width + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+    return image, gain, (left, top)
+
+
+def to_blob(image):
+    # BGR HWC uint8 -> RGB CHW float in [0, 1]
+    return np.ascontiguousarray(image[:, :, ::-1].transpose(2, 0, 1), dtype=np.float32) / 255.0
+
+
+def decode_predictions(prediction, conf, iou=NMS_IOU, classes=None, max_det=MAX_DETECTIONS):
+    """
+    Turn one raw YOLO head output into NMS-filtered boxes.
+
+    Args:
+        prediction: (4 + num_classes, anchors) array of xywh boxes and class scores
+        conf: Minimum class score
+        iou: NMS IoU threshold
+        classes: Optional list of class ids to keep
+
+    Returns:
+        (n, 6) float32 array of [x1, y1, x2, y2, conf, class] in letterboxed pixels
+    """
+    prediction = prediction.T
+    scores = prediction[:, 4:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
+
+    keep = confidences > conf
+    if classes is not None:
+        keep &= np.isin(class_ids, classes)
+    boxes, confidences, class_ids = prediction[keep, :4], confidences[keep], class_ids[keep]
+    if len(boxes) == 0:
+        return np.zeros((0, 6), dtype=np.float32)
+
+    xyxy = np.empty_like(boxes)
+    xyxy[:, :2] = boxes[:, :2] - boxes[:, 2:] / 2
+    xyxy[:, 2:] = boxes[:, :2] + boxes[:, 2:] / 2
+
+    offset_boxes = boxes.copy()
+    offset_boxes[:, :2] = xyxy[:, :2] + class_ids[:, None] * CLASS_OFFSET
+    indices = np.asarray(cv2.dnn.NMSBoxes(offset_boxes.tolist(), confidences.tolist(), conf, iou), dtype=int).reshape(-1)
+    indices = indices[:max_det]
+
+    return np.column_stack([xyxy[indices], confidences[indices], class_ids[indices]]).astype(np.float32)
+
+
+class TorchDetector:
+    """
+    The PyTorch ultralytics model, with explicit input size and thread counts.
+    """
+    def __init__(self, model_path, imgsz=DETECTOR_IMGSZ, intra_op_threads=INTRA_OP_THREADS,
+                 inter_op_threads=INTER_OP_THREADS):
+        self.model = YOLO(model_path)
+        self.imgsz = imgsz
+        if intra_op_threads:
+            torch.set_num_threads(intra_op_threads)
+        if inter_op_threads:
+            try:
+                torch.set_num_interop_threads(inter_op_threads)
+            except RuntimeError as e:
+                # Only allowed before torch has started any parallel work in this process
+                print(f"Could not set inter-op threads: {e}")
+
+    @property
+    def names(self):
+        return self.model.names
+
+    def predict(self, images, conf=0.25, imgsz=None, classes=None, **kwargs):
+        return self.model.predict(images, conf=conf, imgsz=imgsz or self.imgsz, classes=classes, **kwargs)
+
+
+class OnnxDetector:
+    """
+    The same weights exported to ONNX and run with onnxruntime on CPU.
+
+    The export is cached next to the .pt file and redone when the weights
+    are newer. INT8 uses static QDQ quantization, which on CPU is faster
+    than weight-only dynamic quantization for convolutional models. Its
+    activation ranges depend on the footage, so calibration is an explicit
+    step: quantize() writes the INT8 model next to the export, recording
+    the calibration source in its metadata, and predict() refuses to run
+    with int8 until a calibrated model is current.
+
+    predict() mirrors ultralytics' predict and returns ultralytics Results,
+    so Tracker, supervision and BallRefiner use either backend unchanged.
+    """
+    def __init__(self, model_path, imgsz=DETECTOR_IMGSZ, int8=DETECTOR_INT8,
+                 intra_op_threads=INTRA_OP_THREADS, inter_op_threads=INTER_OP_THREADS):
+        self.model_path = model_path
+        self.imgsz = imgsz
+        self.int8 = int8
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.onnx_path = self.export()
+        self._load(self.onnx_path)
+        # Stays on the float session (used to calibrate) until quantize() is run
+        self.calibrated = False
+        if int8 and self._is_current(self.int8_path, self.onnx_path):
+            self._load(self.int8_path)
+            self.calibrated = True
+
+    @property
+    def int8_path(self):
+        return os.path.splitext(self.onnx_path)[0] + '.int8.onnx'
+
+    @staticmethod
+    def _is_current(path, source):
+        return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source)
+
+    def export(self):
+        onnx_path = os.path.splitext(self.model_path)[0] + '.onnx'
+        if not self._is_current(onnx_path, self.model_path):
+            # Dynamic axes: one file serves any batch size and input size
+            onnx_path = YOLO(self.model_path).export(format='onnx', imgsz=self.imgsz, dynamic=True)
+        return onnx_path
+
+    def quantize(self, calibration_frames, source):
+        """
+        Write the INT8 model, calibrating activation ranges on
+        calibration_frames, and switch to it.
+
+        Args:
+            calibration_frames: At least CALIBRATION_FRAMES BGR frames
+                representative of the footage, e.g. spread over a match
+            source: Where the frames came from, stored in the model metadata
+
+        Returns:
+            Path of the INT8 model
+        """
+        if len(calibration_frames) < CALIBRATION_FRAMES:
+            raise ValueError(f"INT8 calibration needs at least {CALIBRATION_FRAMES} frames, "
+                             f"got {len(calibration_frames)}")
+
+        import onnx
+        from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                              quantize_static)
+
+        # Keep the detect head's box decoding in float: box coordinates (0..imgsz)
+        # and class scores (0..1) share its output, and one 8-bit range for both
+        # flattens every score to zero. Its cv2/cv3 conv branches are still quantized.
+        nodes = [node.name for node in onnx.load(self.onnx_path, load_external_data=False).graph.node]
+        head = nodes[-1].rsplit('/', 1)[0] + '/'
+        exclude = [name for name in nodes
+                   if name.startswith(head) and '/cv2.' not in name and '/cv3.' not in name]
+
+        blobs = [self._preprocess(image)[0][None] for image in calibration_frames]
+        input_name = self.input_name
+
+        class FrameReader(CalibrationDataReader):
+            def __init__(self):
+                self.blobs = iter(blobs)
+
+            def get_next(self):
+                blob = next(self.blobs, None)
+                return None if blob is None else {input_name: blob}
+
+        quantize_static(self.onnx_path, self.int8_path, FrameReader(),
+                        quant_format=QuantFormat.QDQ,
+                        per_channel=True,
+                        activation_type=QuantType.QUInt8,
+                        weight_type=QuantType.QInt8,
+                        nodes_to_exclude=exclude)
+
+        int8_model = onnx.load(self.int8_path)
+        metadata = {prop.key: prop.value for prop in int8_model.metadata_props}
+        metadata.update(calibration_source=str(source), calibration_frames=str(len(blobs)))
+        onnx.helper.set_model_props(int8_model, metadata)
+        onnx.save(int8_model, self.int8_path)
+
+        self._load(self.int8_path)
+        self.calibrated = True
+        return self.int8_path
+
+    def _load(self, path):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        if self.inter_op_threads > 1:
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.calibration_source = metadata.get("calibration_source")
+        self.names = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+
+    def _preprocess(self, image, imgsz=None):
+        padded, gain, pad = letterbox(image, imgsz or self.imgsz)
+        return to_blob(padded), gain, pad
+
+    def predict(self, images, conf=0.25, imgsz=None, classes=None, iou=NMS_IOU, **kwargs):
+        if not isinstance(images, (list, tuple)):
+            images = [images]
+        if self.int8 and not self.calibrated:
+            raise RuntimeError(f"No calibrated INT8 model at {self.int8_path}: run quantize() "
+                               f"or calibrate_detector.py on at least {CALIBRATION_FRAMES} frames first")
+
+        prepared = [self._preprocess(image, imgsz) for image in images]
+
+        # Same-shaped inputs (all frames of a video) run as one batch
+        batches = {}
+        for i, (blob, _, _) in enumerate(prepared):
+            batches.setdefault(blob.shape, []).append(i)
+        predictions = [None] * len(images)
+        for indices in batches.values():
+            outputs = self.session.run(None, {self.input_name: np.stack([prepared[i][0] for i in indices])})[0]
+            for i, output in zip(indices, outputs):
+                predictions[i] = output
+
+        results = []
+        for image, (_, gain, (pad_left, pad_top)), prediction in zip(images, prepared, predictions):
+            boxes = decode_predictions(prediction, conf, iou, classes)
+            boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad_left) / gain).clip(0, image.shape[1])
+            boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad_top) / gain).clip(0, image.shape[0])
+            results.append(Results(image, path="", names=self.names, boxes=torch.from_numpy(boxes)))
+        return results
+
+
+def get_detector(model_path, backend=DETECTOR_BACKEND, **kwargs):
+    """
+    Args:
+        model_path: Path to the .pt weights
+        backend: "torch" or "onnx"
+        **kwargs: imgsz, intra_op_threads, inter_op_threads and, for onnx, int8
+                  (int8 with the torch backend raises ValueError)
+
+    Returns:
+        A detector with ultralytics-style names and predict()
+    """
+    if backend == 'torch':
+        if kwargs.pop('int8', DETECTOR_INT8):
+            raise ValueError("INT8 inference needs the onnx backend (DETECTOR_BACKEND=onnx)")
+        return TorchDetector(model_path, **kwargs)
+    if backend == 'onnx':
+        return OnnxDetector(model_path, **kwargs)
+    raise ValueError(f"Unknown detector backend '{backend}'")
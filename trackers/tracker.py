@@ -1,4 +1,3 @@
-from ultralytics import YOLO
 import supervision as sv
 import pickle
 import os
@@ -8,13 +7,17 @@ import cv2
 import sys 
 sys.path.append('../')
 from utils import get_center_of_bbox, get_bbox_width, get_foot_position
+from .ball_refiner import BallRefiner
+from .detector_backend import get_detector, DETECTOR_BACKEND
 
 class Tracker:
-    def __init__(self, model_path):
-        self.model = YOLO(model_path) 
+    def __init__(self, model_path, backend=DETECTOR_BACKEND, **detector_options):
+        # detector_options: imgsz, int8, intra_op_threads, inter_op_threads (see detector_backend)
+        self.model = get_detector(model_path, backend, **detector_options)
         self.tracker = sv.ByteTrack()
 
-    def add_position_to_tracks(sekf,tracks):
+    @staticmethod
+    def add_position_to_tracks(tracks):
         for object, object_tracks in tracks.items():
             for frame_num, track in enumerate(object_tracks):
                 for track_id, track_info in track.items():
@@ -25,7 +28,8 @@ class Tracker:
                         position = get_foot_position(bbox)
                     tracks[object][frame_num][track_id]['position'] = position
 
-    def interpolate_ball_positions(self,ball_positions):
+    @staticmethod
+    def interpolate_ball_positions(ball_positions):
         ball_positions = [x.get(1,{}).get('bbox',[]) for x in ball_positions]
         df_ball_positions = pd.DataFrame(ball_positions,columns=['x1','y1','x2','y2'])
 
@@ -37,22 +41,44 @@ class Tracker:
 
         return ball_positions
 
-    def detect_frames(self, frames):
+    def iter_detections(self, frames):
         batch_size=20 
-        detections = [] 
         for i in range(0,len(frames),batch_size):
             detections_batch = self.model.predict(frames[i:i+batch_size],conf=0.1)
-            detections += detections_batch
-        return detections
+            yield from detections_batch
 
-    def get_object_tracks(self, frames, read_from_stub=False, stub_path=None):
+    def detect_frames(self, frames):
+        return list(self.iter_detections(frames))
+
+    def refine_ball_tracks(self, frames, ball_tracks, live=None, cuts=None):
+        ball_refiner = BallRefiner(self.model)
+        ball_refiner.refine(frames, ball_tracks, live, cuts)
+        self.ball_refinement_stats = ball_refiner.stats
+        return ball_tracks
+
+    def get_object_tracks(self, frames, read_from_stub=False, stub_path=None, refine_ball=True, frame_callback=None, scenes=None,
+                          detection_frames=None):
+        # frame_callback(frame_num, tracks) is called as soon as each frame is tracked
+        # scenes (SceneDetector.detect_scenes) skips non-live frames and resets tracking at cuts
+        # detection_frames are downscaled copies of frames (decode_video "inference") to run the
+        # detector on; boxes are scaled back so tracks stay in full-resolution pixels
         
         if read_from_stub and stub_path is not None and os.path.exists(stub_path):
             with open(stub_path,'rb') as f:
                 tracks = pickle.load(f)
+            if frame_callback is not None:
+                for frame_num in range(len(tracks["players"])):
+                    frame_callback(frame_num, tracks)
             return tracks
 
-        detections = self.detect_frames(frames)
+        live = scenes["live"] if scenes is not None else [True] * len(frames)
+        cuts = set(scenes["cuts"]) if scenes is not None else set()
+        if detection_frames is None:
+            detection_frames = frames
+        detection_scale = np.array([frames[0].shape[1] / detection_frames[0].shape[1],
+                                    frames[0].shape[0] / detection_frames[0].shape[0]] * 2)
+        detections = self.iter_detections([frame for frame, is_live in zip(detection_frames, live) if is_live])
+        self.skipped_frames = len(frames) - sum(live)
 
         tracks={
             "players":[],
@@ -60,12 +86,32 @@ class Tracker:
             "ball":[]
         }
 
-        for frame_num, detection in enumerate(detections):
+        # ByteTrack.reset() also restarts its id counter, so ids issued after a
+        # cut are shifted past every id used before it to stay unique per match
+        id_offset = 0
+        max_track_id = 0
+
+        for frame_num in range(len(frames)):
+            if not live[frame_num]:
+                tracks["players"].append({})
+                tracks["referees"].append({})
+                tracks["ball"].append({})
+                if frame_callback is not None:
+                    frame_callback(frame_num, tracks)
+                continue
+
+            # Track ids do not survive a shot change
+            if frame_num in cuts:
+                self.tracker.reset()
+                id_offset = max_track_id
+
+            detection = next(detections)
             cls_names = detection.names
             cls_names_inv = {v:k for k,v in cls_names.items()}
 
             # Covert to supervision Detection format
             detection_supervision = sv.Detections.from_ultralytics(detection)
+            detection_supervision.xyxy = detection_supervision.xyxy * detection_scale
 
             # Convert GoalKeeper to player object
             for object_ind , class_id in enumerate(detection_supervision.class_id):
@@ -82,7 +128,8 @@ class Tracker:
             for frame_detection in detection_with_tracks:
                 bbox = frame_detection[0].tolist()
                 cls_id = frame_detection[3]
-                track_id = frame_detection[4]
+                track_id = frame_detection[4] + id_offset
+                max_track_id = max(max_track_id, track_id)
 
                 if cls_id == cls_names_inv['player']:
                     tracks["players"][frame_num][track_id] = {"bbox":bbox}
@@ -97,6 +144,13 @@ class Tracker:
                 if cls_id == cls_names_inv['ball']:
                     tracks["ball"][frame_num][1] = {"bbox":bbox}
 
+            if frame_callback is not None:
+                frame_callback(frame_num, tracks)
+
+        # High-resolution ball pass on frames the full-frame pass missed
+        if refine_ball:
+            self.refine_ball_tracks(frames, tracks["ball"], live, cuts)
+
         if stub_path is not None:
             with open(stub_path,'wb') as f:
                 pickle.dump(tracks,f)
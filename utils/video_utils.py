@@ -1,4 +1,18 @@
+import os
+import tempfile
+import uuid
 import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Segment boundaries for parallel decoding are rounded to this many frames,
+# so each worker's seek lands on a keyframe for fixed-GOP encodes (x264 default)
+DECODE_GOP_SIZE = int(os.getenv('DECODE_GOP_SIZE', '250'))
+DECODE_WORKERS = int(os.getenv('DECODE_WORKERS', str(os.cpu_count() or 1)))
+
+DECODE_OUTPUTS = ("bgr", "inference", "gray")
+# Parallel decode workers write frames into memory-mapped files here (RAM-backed on Linux)
+DECODE_BUFFER_DIR = os.getenv('DECODE_BUFFER_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir())
 
 def read_video(video_path):
     cap = cv2.VideoCapture(video_path)
@@ -16,3 +30,220 @@ def save_video(ouput_video_frames,output_video_path):
     for frame in ouput_video_frames:
         out.write(frame)
     out.release()
+
+def get_video_info(video_path):
+    cap = cv2.VideoCapture(video_path)
+    info = {
+        "frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    }
+    cap.release()
+    return info
+
+def _gray_size(width, height, gray_scale):
+    return max(1, int(round(width * gray_scale))), max(1, int(round(height * gray_scale)))
+
+def _output_shape(output, width, height, inference_size, gray_scale):
+    if output == "bgr":
+        return height, width, 3
+    if output == "inference":
+        return inference_size[1], inference_size[0], 3
+    gray_width, gray_height = _gray_size(width, height, gray_scale)
+    return gray_height, gray_width
+
+def _convert_frame(frame, outputs, inference_size, gray_scale):
+    converted = {}
+    if "bgr" in outputs:
+        converted["bgr"] = frame
+    if "inference" in outputs:
+        converted["inference"] = cv2.resize(frame, inference_size, interpolation=cv2.INTER_AREA)
+    if "gray" in outputs:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if gray_scale != 1.0:
+            gray = cv2.resize(gray, _gray_size(frame.shape[1], frame.shape[0], gray_scale),
+                              interpolation=cv2.INTER_AREA)
+        converted["gray"] = gray
+    return converted
+
+def decode_video(video_path, outputs=("bgr",), inference_size=(640, 384), gray_scale=1.0,
+                 stride=1, start=0, end=None):
+    """
+    Decode a video once into the representations each stage needs.
+
+    Args:
+        video_path: Input video
+        outputs: Any of "bgr" (full resolution), "inference" (resized to
+                 inference_size for detection) and "gray" (for optical flow)
+        inference_size: (width, height) of the "inference" frames
+        gray_scale: Scale factor for the "gray" frames
+        stride: Keep every stride-th frame; skipped frames are grabbed
+                but never converted
+        start: First frame index
+        end: Frame index to stop at (exclusive), None for the whole video
+
+    Returns:
+        Dict with one list per requested output plus "frame_indices"
+    """
+    unknown = set(outputs) - set(DECODE_OUTPUTS)
+    if unknown:
+        raise ValueError(f"Unknown decode outputs: {sorted(unknown)}")
+
+    decoded = {output: [] for output in outputs}
+    decoded["frame_indices"] = []
+
+    cap = cv2.VideoCapture(video_path)
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+    frame_num = start
+    while end is None or frame_num < end:
+        if (frame_num - start) % stride != 0:
+            if not cap.grab():
+                break
+            frame_num += 1
+            continue
+
+        ret, frame = cap.read()
+        if not ret:
+            break
+        for output, converted in _convert_frame(frame, outputs, inference_size, gray_scale).items():
+            decoded[output].append(converted)
+        decoded["frame_indices"].append(frame_num)
+        frame_num += 1
+
+    cap.release()
+    return decoded
+
+def _decode_segment(args):
+    # Writes each kept frame into the output buffers at slot frame_num // stride;
+    # only the frame indices travel back to the parent
+    video_path, buffers, kwargs = args
+    stride = kwargs.get("stride", 1)
+    outputs = {output: np.memmap(path, dtype=np.uint8, mode='r+', shape=shape)
+               for output, (path, shape) in buffers.items()}
+    decoded = decode_video(video_path, outputs=tuple(buffers), **kwargs)
+    for output, frames in outputs.items():
+        for frame_num, frame in zip(decoded["frame_indices"], decoded[output]):
+            frames[frame_num // stride] = frame
+        frames.flush()
+    return decoded["frame_indices"]
+
+def get_decode_segments(num_frames, num_workers, stride=1, gop_size=DECODE_GOP_SIZE):
+    """
+    Split [0, num_frames) into at most num_workers GOP-aligned segments.
+
+    Segment starts are multiples of gop_size, rounded up so the stride
+    sequence continues unbroken from frame 0 across segments.
+    """
+    if num_frames <= 0:
+        return []
+    num_gops = -(-num_frames // gop_size)
+    gops_per_segment = -(-num_gops // max(1, num_workers))
+
+    segments = []
+    for first_gop in range(0, num_gops, gops_per_segment):
+        segment_start = first_gop * gop_size
+        segment_end = min(num_frames, (first_gop + gops_per_segment) * gop_size)
+        segments.append((segment_start, segment_end))
+
+    # Shift starts onto the stride grid; the skipped frames belong to no output
+    aligned = []
+    for segment_start, segment_end in segments:
+        segment_start = -(-segment_start // stride) * stride
+        if segment_start < segment_end:
+            aligned.append((segment_start, segment_end))
+    return aligned
+
+def decode_video_parallel(video_path, num_workers=DECODE_WORKERS, gop_size=DECODE_GOP_SIZE, **kwargs):
+    """
+    decode_video split across processes over independent GOP-aligned segments.
+
+    Workers decode straight into memory-mapped buffers in DECODE_BUFFER_DIR
+    rather than pickling frames back, so each frame exists once in memory.
+    The buffer files are deleted as soon as decoding ends; the returned
+    frames keep the mapping alive until they are released. Falls back to a
+    single in-process decode for short videos.
+
+    Args:
+        video_path: Input video
+        num_workers: Number of decode processes
+        gop_size: Keyframe interval of the encode
+        **kwargs: Passed to decode_video (outputs, inference_size, gray_scale, stride)
+
+    Returns:
+        Same dict as decode_video, in frame order
+    """
+    outputs = kwargs.pop("outputs", ("bgr",))
+    unknown = set(outputs) - set(DECODE_OUTPUTS)
+    if unknown:
+        raise ValueError(f"Unknown decode outputs: {sorted(unknown)}")
+    stride = kwargs.get("stride", 1)
+    info = get_video_info(video_path)
+    segments = get_decode_segments(info["frames"], num_workers, stride, gop_size)
+
+    if len(segments) <= 1:
+        return decode_video(video_path, outputs=outputs, **kwargs)
+
+    num_slots = -(-info["frames"] // stride)
+    inference_size = kwargs.get("inference_size", (640, 384))
+    gray_scale = kwargs.get("gray_scale", 1.0)
+    buffers = {}
+    try:
+        for output in outputs:
+            path = os.path.join(DECODE_BUFFER_DIR, f"decode_{output}_{uuid.uuid4().hex}.bin")
+            shape = (num_slots, *_output_shape(output, info["width"], info["height"], inference_size, gray_scale))
+            buffers[output] = (path, shape, np.memmap(path, dtype=np.uint8, mode='w+', shape=shape))
+
+        jobs = [(video_path, {output: (path, shape) for output, (path, shape, _) in buffers.items()},
+                 {**kwargs, "start": segment_start, "end": segment_end})
+                for segment_start, segment_end in segments]
+        with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+            frame_indices = [frame_num for part in executor.map(_decode_segment, jobs) for frame_num in part]
+    finally:
+        for path, _, _ in buffers.values():
+            os.remove(path)
+
+    # The container's frame count can overstate the decodable frames
+    slots = [frame_num // stride for frame_num in frame_indices]
+    decoded = {"frame_indices": frame_indices}
+    for output, (_, _, frames) in buffers.items():
+        decoded[output] = list(frames[:len(slots)] if slots == list(range(len(slots))) else frames[slots])
+    return decoded
+
+def read_crops(video_path, crop_requests):
+    """
+    Full-resolution crops for a sparse set of frames, decoded on demand.
+
+    Args:
+        video_path: Input video
+        crop_requests: Dict of frame index -> list of [x1, y1, x2, y2] boxes
+
+    Returns:
+        Dict of frame index -> list of BGR crops in request order
+    """
+    crops = {}
+    if not crop_requests:
+        return crops
+
+    cap = cv2.VideoCapture(video_path)
+    wanted = sorted(crop_requests)
+    frame_num = wanted[0]
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+
+    for target in wanted:
+        # Grab forward without converting frames nobody asked for
+        while frame_num < target:
+            if not cap.grab():
+                break
+            frame_num += 1
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame_num += 1
+        crops[target] = [frame[int(y1):int(y2), int(x1):int(x2)].copy()
+                         for x1, y1, x2, y2 in crop_requests[target]]
+
+    cap.release()
+    return crops